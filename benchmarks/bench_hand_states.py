@@ -0,0 +1,44 @@
+from cards import Card, Hand
+from random import Random
+from timeit import timeit
+import hand_states
+
+
+# Run from the repository root with: python -m benchmarks.bench_hand_states
+
+HANDS = 10000
+
+
+def make_hands() -> list[list[Card]]:
+    random = Random(0)
+    pack = [Card.from_code(code) for code in range(52)]
+    return [random.sample(pack, random.randint(2, 5)) for _ in range(HANDS)]
+
+
+def score_with_hand(hands: list[list[Card]]) -> None:
+    for cards in hands:
+        hand = Hand()
+        for card in cards:
+            hand.add_card(card)
+            hand.get_score()
+
+
+def score_with_states(hands: list[list[int]]) -> None:
+    step_code = hand_states.step_code
+    score = hand_states.SCORES
+    for codes in hands:
+        state = hand_states.START
+        for code in codes:
+            state = step_code(state, code)
+            score[state]
+
+
+if __name__ == "__main__":
+    hands = make_hands()
+    codes = [[card.get_code() for card in cards] for cards in hands]
+    repeats = 20
+    hand_time = timeit(lambda: score_with_hand(hands), number=repeats)
+    state_time = timeit(lambda: score_with_states(codes), number=repeats)
+    draws = sum(len(cards) for cards in hands) * repeats
+    print(f"Hand.get_score    {hand_time / draws * 1e9:8.1f} ns per card")
+    print(f"hand_states table {state_time / draws * 1e9:8.1f} ns per card")
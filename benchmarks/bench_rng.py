@@ -0,0 +1,35 @@
+from array import array
+from random import Random
+from settings import Settings
+from timeit import timeit
+import rng
+
+
+# Run from the repository root with: python -m benchmarks.bench_rng
+
+SHUFFLES = 2000
+
+
+def reseeded(codes: array) -> None:
+    """The old way: a new random.Random for every shuffle."""
+    for seed in range(SHUFFLES):
+        Random(seed).shuffle(codes)
+
+
+def from_source(source, codes: array) -> None:
+    for _ in range(SHUFFLES):
+        source.shuffle(codes)
+
+
+if __name__ == "__main__":
+    codes = array("B", range(52)) * Settings.MAX_DECK_PACKS
+    timings = [("Random(seed) each", timeit(lambda: reseeded(codes), number=1))]
+    for name in sorted(rng.BACKENDS):
+        try:
+            source = rng.make(name, 0)
+        except ImportError:
+            print(f"{name:18} skipped, needs NumPy")
+            continue
+        timings.append((name, timeit(lambda: from_source(source, codes), number=1)))
+    for name, seconds in timings:
+        print(f"{name:18} {SHUFFLES / seconds:10.0f} shuffles of {len(codes)} cards per second")
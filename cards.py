@@ -1,20 +1,66 @@
 from settings import Settings
 from random import Random
+import counting
 
 
 class Card():
+    """
+    A playing card. There is one shared, immutable Card for each rank and suit,
+    so Card(rank, suit) and Card.of(rank, suit) return the same object and
+    cards can be compared by identity and used as dictionary keys.
+    """
 
     SUITS = ["S", "D", "H", "C"]
     RANKS = ["A", "2", "3", "4", "5", "6",
                   "7", "8", "9", "10", "J", "Q", "K"]
 
-    def __init__(self, rank: str, suit: str):
+    __slots__ = ("__rank", "__suit", "__code", "__value")
+    __TABLE = {}
+    __BY_CODE = []
+
+    def __new__(cls, rank: str, suit: str):
+        card = Card.__TABLE.get((rank, suit))
+        if card is not None:
+            return card
         if rank not in Card.RANKS:
             raise ValueError("Invalid rank passed.")
-        if suit not in Card.SUITS:
-            raise ValueError("Invalid suit passed.")
-        self.__rank = rank
-        self.__suit = suit
+        raise ValueError("Invalid suit passed.")
+
+    @classmethod
+    def of(cls, rank: str, suit: str) -> "Card":
+        return cls(rank, suit)
+
+    @staticmethod
+    def from_code(code: int) -> "Card":
+        """Card for a code of suit index * 13 + rank index."""
+        return Card.__BY_CODE[code]
+
+    @staticmethod
+    def _build_table() -> None:
+        for suit in Card.SUITS:
+            for rank in Card.RANKS:
+                card = object.__new__(Card)
+                rank_index = Card.RANKS.index(rank)
+                object.__setattr__(card, "_Card__rank", rank)
+                object.__setattr__(card, "_Card__suit", suit)
+                object.__setattr__(card, "_Card__code",
+                                   Card.SUITS.index(suit) * 13 + rank_index)
+                object.__setattr__(card, "_Card__value",
+                                   min(rank_index + 1, 10))
+                Card.__TABLE[(rank, suit)] = card
+                Card.__BY_CODE.append(card)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Cards cannot be changed.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Cards cannot be changed.")
+
+    def __reduce__(self):
+        return (Card.of, (self.__rank, self.__suit))
+
+    def __repr__(self) -> str:
+        return f"Card({self.__rank!r}, {self.__suit!r})"
 
     def get_rank(self) -> str:
         return self.__rank
@@ -22,13 +68,31 @@ class Card():
     def get_suit(self) -> str:
         return self.__suit
 
+    def get_code(self) -> int:
+        return self.__code
+
+    def get_value(self) -> int:
+        """Blackjack value of the card, counting an ace as 1."""
+        return self.__value
+
     def get_string(self) -> str:
         return self.__rank + self.__suit
 
 
-class Deck():
+Card._build_table()
 
-    def __init__(self, cards: list[Card] = None, number_of_decks: int = None):
+
+class Deck():
+    """
+    Cards to be dealt, drawn from the end of the list. The deck keeps a running
+    count of the cards drawn since the last shuffle, using a tag table from
+    counting.py (Hi-Lo by default).
+    """
+
+    def __init__(self, cards: list[Card] = None, number_of_decks: int = None,
+                 tags: tuple[int, ...] = counting.HI_LO):
+        self.__tags = counting.tags_by_code(tags)
+        self.__running_count = 0
         if cards is None and number_of_decks is not None:
             self.__cards = []
             self.__generate_deck(number_of_decks)
@@ -43,10 +107,8 @@ class Deck():
             raise ValueError("Invalid number of decks passed.")
         if number_of_decks < 0 or number_of_decks > Settings.MAX_DECK_PACKS:
             raise ValueError("Invalid number of decks passed.")
-        for _ in range(number_of_decks):
-            for suit in Card.SUITS:
-                for rank in Card.RANKS:
-                    self.__cards.append(Card(rank, suit))
+        pack = [Card.from_code(code) for code in range(52)]
+        self.__cards = pack * number_of_decks
 
     def __pass_cards(self, cards: list[Card]):
         if not all([isinstance(card, Card) for card in cards]):
@@ -58,11 +120,30 @@ class Deck():
     def pick(self) -> Card:
         if len(self.__cards) == 0:
             raise ValueError("Taking card from empty deck.")
-        return self.__cards.pop()
+        card = self.__cards.pop()
+        self.__running_count += self.__tags[card.get_code()]
+        return card
 
     def shuffle(self, seed: int) -> None:
-        """Randomizes the deck of cards"""
+        """Randomizes the deck of cards, and starts the count again"""
         Random(seed).shuffle(self.__cards)
+        self.__running_count = 0
+
+    def get_codes(self) -> bytes:
+        """The code of each card left, one byte a card, in the order they are stored."""
+        return bytes(card.get_code() for card in self.__cards)
+
+    def get_running_count(self) -> int:
+        return self.__running_count
+
+    def get_decks_remaining(self) -> float:
+        return len(self.__cards) / 52
+
+    def get_true_count(self) -> float:
+        """Running count per deck remaining, or 0 when the deck is empty."""
+        if len(self.__cards) == 0:
+            return 0.0
+        return self.__running_count * 52 / len(self.__cards)
 
 
 class Hand():
@@ -75,6 +156,9 @@ class Hand():
             if not all([isinstance(card, Card) for card in cards]):
                 raise ValueError("All passed cards must be Card objects.")
             self.__cards = cards
+        # running score: total with every ace as 1, and number of aces
+        self.__hard_total = sum(card.get_value() for card in self.__cards)
+        self.__aces = sum(card.get_value() == 1 for card in self.__cards)
         # is_active
         self.__bet = None
         self.__is_active = True
@@ -105,45 +189,29 @@ class Hand():
         if not isinstance(card, Card):
             raise ValueError("Invalid card object passed.")
         self.__cards.append(card)
+        value = card.get_value()
+        self.__hard_total += value
+        if value == 1:
+            self.__aces += 1
 
     def get_score(self) -> int:
-        hand = self.__cards
-        # Check list is empty
-        if len(hand) == 0:
-            return 0
-        # First, extract the ranks from the hand
-        ranks = [card.get_rank() for card in hand]
-        # Replace the jacks, queens and kings with a ten
-        ranks = list(map(lambda rank: "10" if rank in {
-            "J", "Q", "K"} else rank, ranks))
-        # Get how many aces and remove from list
-        aces_quantity = ranks.count("A")
-        number_ranks = [int(rank) for rank in ranks if rank != "A"]
-        # Add up the number ranks
-        score = sum(number_ranks)
-        # Check whether there are aces
-        if aces_quantity == 0:
-            return score
-        # Add aces such that score is maximized but <= 21
-        eleven_counter = aces_quantity
-        aces_score = [11]*eleven_counter
-        while sum(aces_score) + score > 21 and eleven_counter > 0:
-            eleven_counter -= 1
-            aces_score = [11]*eleven_counter + \
-                [1]*(aces_quantity-eleven_counter)
-        # Return final score
-        return sum(aces_score) + score
+        """
+        Score of the hand, from the running totals kept by add_card() and
+        pop_card(). At most one ace can count as 11 without going over 21.
+        """
+        if self.__aces and self.__hard_total <= 11:
+            return self.__hard_total + 10
+        return self.__hard_total
+
+    def is_soft(self) -> bool:
+        """Whether an ace is being counted as 11."""
+        return self.__aces > 0 and self.__hard_total <= 11
 
     def is_blackjack(self) -> bool:
-        # First, check the score is 21
-        if self.get_score() != 21:
-            return False
-        if len(self.__cards) != 2:
-            return False
-        return True
+        return len(self.__cards) == 2 and self.get_score() == 21
 
     def is_bust(self) -> bool:
-        return self.get_score() > 21
+        return self.__hard_total > 21
 
     def has_pair(self) -> bool:
         if self.number_of_cards() != 2:
@@ -153,7 +221,12 @@ class Hand():
         return True
 
     def pop_card(self) -> Card:
-        return self.__cards.pop()
+        card = self.__cards.pop()
+        value = card.get_value()
+        self.__hard_total -= value
+        if value == 1:
+            self.__aces -= 1
+        return card
 
     def double_bet(self) -> None:
         self.__bet *= 2
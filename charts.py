@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor
+from settings import Settings
+import mmap
+import os
+import struct
+import solver
+
+
+# Binary chart file: a header, then one block per deck count of a byte for
+# each (row, upcard), in the order of ROWS and upcards ace to ten. The high
+# four bits of a byte are the action's index in solver.ACTIONS and the low
+# four bits are the fallback's.
+MAGIC = b"BJCH"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBB")
+ROWS = [(kind, total) for kind, total, _ in solver.chart_hands()]
+ROW_INDEXES = {row: index for index, row in enumerate(ROWS)}
+UPCARDS = 10
+
+
+def solve_upcard(number_of_decks: int, upcard: int, hits_soft_17: bool) -> bytes:
+    """The chart bytes for one upcard, in ROWS order."""
+    table = solver.strategy_table(number_of_decks, [upcard], hits_soft_17)
+    cells = bytearray()
+    for kind, total in ROWS:
+        action, fallback = solver.best_actions(table[(kind, total, upcard)])
+        cells.append(solver.ACTIONS.index(action) << 4 |
+                     solver.ACTIONS.index(fallback))
+    return bytes(cells)
+
+
+def generate_charts(path: str, workers: int = None, hits_soft_17: bool = None) -> None:
+    """
+    Solve a basic-strategy chart for every deck count from 1 to
+    Settings.MAX_DECK_PACKS over a process pool, one upcard per task, and
+    write them to a chart file.
+    """
+    if hits_soft_17 is None:
+        hits_soft_17 = Settings.DEALER_HITS_SOFT_17
+    deck_counts = range(1, Settings.MAX_DECK_PACKS + 1)
+    tasks = [(decks, upcard) for decks in deck_counts
+             for upcard in range(1, UPCARDS + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        columns = list(pool.map(solve_upcard, [decks for decks, _ in tasks],
+                                [upcard for _, upcard in tasks], [hits_soft_17] * len(tasks)))
+    charts = {}
+    for (decks, upcard), column in zip(tasks, columns):
+        charts.setdefault(decks, [None] * UPCARDS)[upcard - 1] = column
+    write_charts(path, charts, hits_soft_17)
+
+
+def write_charts(path: str, charts: dict[int, list[bytes]], hits_soft_17: bool) -> None:
+    """Write charts, given as the column of bytes for each upcard keyed by deck count."""
+    deck_counts = sorted(charts)
+    if deck_counts != list(range(1, len(deck_counts) + 1)):
+        raise ValueError("Charts must cover every deck count from 1.")
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, hits_soft_17,
+                               len(deck_counts), len(ROWS), UPCARDS))
+        for decks in deck_counts:
+            columns = charts[decks]
+            for row in range(len(ROWS)):
+                file.write(bytes(columns[upcard][row]
+                                 for upcard in range(UPCARDS)))
+
+
+class Charts():
+    """
+    A chart file, mapped into memory when opened. Nothing past the header is
+    read until a chart cell is looked up.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, hits_soft_17, deck_counts, rows, upcards = HEADER.unpack_from(
+            self.__data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a chart file.")
+        if rows != len(ROWS) or upcards != UPCARDS:
+            raise ValueError("Chart file has a different layout.")
+        self.__hits_soft_17 = bool(hits_soft_17)
+        self.__deck_counts = deck_counts
+
+    def hits_soft_17(self) -> bool:
+        return self.__hits_soft_17
+
+    def deck_counts(self) -> int:
+        return self.__deck_counts
+
+    def cell(self, number_of_decks: int, kind: str, total: int, upcard: int) -> int:
+        """The byte for a chart row against an upcard (ace is 1)."""
+        if number_of_decks < 1 or number_of_decks > self.__deck_counts:
+            raise ValueError("No chart for that number of decks.")
+        if upcard < 1 or upcard > UPCARDS:
+            raise ValueError("Invalid upcard passed.")
+        if (kind, total) not in ROW_INDEXES:
+            raise ValueError("No chart row for that hand.")
+        row = ROW_INDEXES[(kind, total)]
+        offset = HEADER.size + \
+            ((number_of_decks - 1) * len(ROWS) + row) * UPCARDS + upcard - 1
+        return self.__data[offset]
+
+    def action(self, number_of_decks: int, kind: str, total: int, upcard: int) -> tuple[str, str]:
+        """The chart's action and fallback for a row against an upcard (ace is 1)."""
+        cell = self.cell(number_of_decks, kind, total, upcard)
+        return solver.ACTIONS[cell >> 4], solver.ACTIONS[cell & 15]
+
+    def close(self) -> None:
+        self.__data.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Generate basic-strategy charts for every deck count.")
+    parser.add_argument("--output", default="charts.bin")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--hits-soft-17", action="store_true")
+    args = parser.parse_args()
+    generate_charts(args.output, args.workers, args.hits_soft_17 or None)
+    print(f"wrote {os.path.getsize(args.output)} bytes to {args.output}")
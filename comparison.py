@@ -0,0 +1,177 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from engine import Engine
+from has_hands import Player
+from rng import MersenneTwister
+from settings import Settings
+from shoe import Shoe
+from shared_corpus import SharedCorpus, iter_shoe_orders
+from simulation import SIMULATION_PURSE
+import math
+
+
+def shoe_corpus(shoes: int, seed: int, number_of_decks: int = 1) -> list[array]:
+    """The shoes of shared_corpus.iter_shoe_orders(), kept in this process."""
+    return list(iter_shoe_orders(shoes, seed, number_of_decks))
+
+
+def play_shoe(order, strategy, number_of_players: int = 1) -> tuple[int, int]:
+    """
+    Play rounds from one shoe order, an array or memoryview of card codes,
+    until the cut card comes out, with the strategy at every seat. Returns the
+    number of hands and their net result.
+    """
+    players = [Player(f"Player {i + 1}", SIMULATION_PURSE, strategy)
+               for i in range(number_of_players)]
+    engine = Engine(players, len(order) // 52)
+    # A fixed source, so a round running past the end reshuffles the tray the same way
+    engine.deck = Shoe(engine.number_of_decks, rng=MersenneTwister(0))
+    engine.deck.load(order)
+    hands = net = 0
+    while not engine.deck.needs_shuffle():
+        for _, result in engine.play_round():
+            hands += 1
+            net += result
+    return hands, net
+
+
+class PairedComparison():
+    """
+    Net results of several strategies over the same shoes, kept as streaming
+    sums. Each strategy is compared with the first, the baseline, shoe by
+    shoe: the shoes' luck is shared, so it cancels out of the differences.
+    """
+
+    def __init__(self, number_of_strategies: int):
+        if number_of_strategies < 2:
+            raise ValueError("At least two strategies are needed.")
+        self.shoes = 0
+        self.hands = [0] * number_of_strategies
+        self.net_total = [0] * number_of_strategies
+        self.net_squares = [0] * number_of_strategies
+        self.difference_total = [0] * number_of_strategies
+        self.difference_squares = [0] * number_of_strategies
+
+    def add_shoe(self, hands: list[int], nets: list[int]) -> None:
+        """Record one shoe's hands and net result for each strategy."""
+        self.shoes += 1
+        for i, (count, net) in enumerate(zip(hands, nets)):
+            difference = net - nets[0]
+            self.hands[i] += count
+            self.net_total[i] += net
+            self.net_squares[i] += net * net
+            self.difference_total[i] += difference
+            self.difference_squares[i] += difference * difference
+
+    def merge(self, other: "PairedComparison") -> None:
+        self.shoes += other.shoes
+        for i in range(len(self.hands)):
+            self.hands[i] += other.hands[i]
+            self.net_total[i] += other.net_total[i]
+            self.net_squares[i] += other.net_squares[i]
+            self.difference_total[i] += other.difference_total[i]
+            self.difference_squares[i] += other.difference_squares[i]
+
+    def get_ev_per_hand(self, strategy: int) -> float:
+        """Mean net result of a hand, as a fraction of the minimum bet."""
+        if self.hands[strategy] == 0:
+            return 0.0
+        return self.net_total[strategy] / self.hands[strategy] / Settings.MINIMUM_BET
+
+    def get_mean_difference(self, strategy: int) -> float:
+        """Mean gain per shoe over the baseline, in minimum bets."""
+        if self.shoes == 0:
+            return 0.0
+        return self.difference_total[strategy] / self.shoes / Settings.MINIMUM_BET
+
+    def get_paired_standard_error(self, strategy: int) -> float:
+        """Standard error of get_mean_difference(), from the spread of the paired differences."""
+        return self.__standard_error(self.difference_total[strategy],
+                                     self.difference_squares[strategy])
+
+    def get_independent_standard_error(self, strategy: int) -> float:
+        """
+        The standard error the same difference would have if each strategy had
+        played its own shoes, to show what the pairing saves.
+        """
+        baseline = self.__standard_error(self.net_total[0], self.net_squares[0])
+        other = self.__standard_error(self.net_total[strategy], self.net_squares[strategy])
+        return math.hypot(baseline, other)
+
+    def __standard_error(self, total: int, squares: int) -> float:
+        if self.shoes < 2:
+            return math.inf
+        variance = (squares - total * total / self.shoes) / (self.shoes - 1)
+        return math.sqrt(max(variance, 0.0) / self.shoes) / Settings.MINIMUM_BET
+
+
+def _compare(orders, strategies: list, number_of_players: int) -> PairedComparison:
+    comparison = PairedComparison(len(strategies))
+    for order in orders:
+        played = [play_shoe(order, strategy, number_of_players)
+                  for strategy in strategies]
+        comparison.add_shoe([hands for hands, _ in played],
+                            [net for _, net in played])
+    return comparison
+
+
+def compare_shared(name: str, start: int, stop: int, strategies: list,
+                   number_of_players: int = 1) -> PairedComparison:
+    """Compare strategies over shoes start to stop of a SharedCorpus, in a worker process."""
+    corpus = SharedCorpus.attach(name)
+    try:
+        return _compare((corpus.shoe(i) for i in range(start, stop)),
+                        strategies, number_of_players)
+    finally:
+        corpus.close()
+
+
+def compare_strategies(strategies: list, shoes: int, seed: int, number_of_decks: int = 1,
+                       number_of_players: int = 1, workers: int = 1) -> PairedComparison:
+    """
+    Play every strategy over the same corpus of shoes and compare each with
+    the first. The corpus is built once and replayed for each strategy. With
+    more than one worker it is built in shared memory, and each worker process
+    replays its share of the shoes from there; the result is the same.
+    """
+    if workers < 1:
+        raise ValueError("At least one worker is needed.")
+    if workers == 1:
+        return _compare(shoe_corpus(shoes, seed, number_of_decks),
+                        strategies, number_of_players)
+    bounds = [shoes * i // workers for i in range(workers + 1)]
+    comparison = PairedComparison(len(strategies))
+    with SharedCorpus.create(shoes, seed, number_of_decks) as corpus, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(compare_shared, [corpus.get_name()] * workers,
+                            bounds[:-1], bounds[1:], [strategies] * workers,
+                            [number_of_players] * workers)
+        for partial in partials:
+            comparison.merge(partial)
+    return comparison
+
+
+if __name__ == "__main__":
+    import argparse
+    from charts import Charts
+    from strategies import BasicStrategy, DealerStrategy
+    parser = argparse.ArgumentParser(
+        description="Compare basic strategy with playing like the dealer over the same shoes.")
+    parser.add_argument("--charts", default="charts.bin")
+    parser.add_argument("--shoes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    charts = Charts(args.charts)
+    strategies = [DealerStrategy(), BasicStrategy.from_charts(charts, args.decks)]
+    charts.close()
+    comparison = compare_strategies(strategies, args.shoes, args.seed,
+                                    args.decks, args.players, args.workers)
+    print(f"shoes {comparison.shoes}")
+    print(f"EV per hand: dealer {comparison.get_ev_per_hand(0):+.4f}, "
+          f"basic {comparison.get_ev_per_hand(1):+.4f}")
+    print(f"basic gains {comparison.get_mean_difference(1):+.4f} bets per shoe, "
+          f"paired SE {comparison.get_paired_standard_error(1):.4f} "
+          f"(unpaired {comparison.get_independent_standard_error(1):.4f})")
@@ -0,0 +1,11 @@
+# Card counting tag tables, with a tag for each rank in the order of Card.RANKS
+HI_LO = (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1)
+KO = (-1, 1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1)
+OMEGA_II = (0, 1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2)
+
+
+def tags_by_code(tags: tuple[int, ...]) -> tuple[int, ...]:
+    """The tag of each card code, so a count can be updated with one lookup."""
+    if len(tags) != 13:
+        raise ValueError("Tag table needs a tag for each rank.")
+    return tuple(tags[code % 13] for code in range(52))
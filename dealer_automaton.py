@@ -0,0 +1,71 @@
+from settings import Settings
+import hand_states
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _build_draws(hits_soft_17: bool) -> bytes:
+    """For each hand state, whether the dealer draws another card."""
+    draws = bytearray(hand_states.NUMBER_OF_STATES)
+    for state in range(hand_states.NUMBER_OF_STATES):
+        if hand_states.is_bust(state):
+            continue
+        score = hand_states.score(state)
+        if score == 17 and hits_soft_17:
+            draws[state] = hand_states.is_soft(state)
+        else:
+            draws[state] = score < 17
+    return bytes(draws)
+
+
+DRAWS = {False: _build_draws(False), True: _build_draws(True)}
+
+
+def _hits_soft_17(hits_soft_17: bool) -> bool:
+    return Settings.DEALER_HITS_SOFT_17 if hits_soft_17 is None else hits_soft_17
+
+
+def play(values: list[int], hits_soft_17: bool = None) -> int:
+    """
+    Play one dealer hand from its card values (ace is 1), in the order they are
+    dealt, and return the final hand state. Extra values are left undrawn.
+    """
+    draws = DRAWS[_hits_soft_17(hits_soft_17)]
+    state = hand_states.START
+    for value in values:
+        if hand_states.number_of_cards(state) >= 2 and not draws[state]:
+            break
+        state = hand_states.step(state, value)
+    if draws[state]:
+        raise ValueError("Not enough cards to finish the dealer's hand.")
+    return state
+
+
+def play_batch(values, hits_soft_17: bool = None):
+    """
+    Play many dealer hands at once. values is a NumPy array of card values
+    with one row per hand: the hole card, the upcard and then the cards the
+    dealer would draw. Returns the final totals (22 for a bust) and bust flags.
+    """
+    if np is None:
+        raise ImportError("play_batch() needs NumPy installed.")
+    values = np.asarray(values)
+    if values.ndim != 2 or values.shape[1] < 2:
+        raise ValueError("Each hand needs at least two cards.")
+    draws = np.frombuffer(DRAWS[_hits_soft_17(hits_soft_17)], dtype=np.uint8)
+    transitions = np.frombuffer(
+        hand_states.TRANSITIONS, dtype=np.uint16).reshape(-1, 10)
+    states = np.full(values.shape[0], hand_states.START, dtype=np.intp)
+    for column in range(values.shape[1]):
+        drawn = transitions[states, values[:, column] - 1]
+        if column < 2:
+            states = drawn.astype(np.intp)
+        else:
+            states = np.where(draws[states] == 1, drawn, states)
+    if draws[states].any():
+        raise ValueError("Not enough cards to finish the dealer's hand.")
+    totals = np.frombuffer(hand_states.SCORES, dtype=np.uint8)[states]
+    return totals, states == hand_states.BUST
@@ -0,0 +1,133 @@
+from functools import lru_cache
+from settings import Settings
+from dealer_automaton import DRAWS
+import hand_states
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Positions in a dealer outcome distribution: final totals 17 to 21, then bust and blackjack
+OUTCOMES = ("17", "18", "19", "20", "21", "bust", "blackjack")
+BUST = 5
+BLACKJACK = 6
+
+CACHE_SIZE = 2 ** 16
+# Most cards of one value the dealer can draw (aces, from a hole card onwards)
+MAX_DRAWN = 12
+
+
+def full_composition(number_of_decks: int) -> tuple[int, ...]:
+    """Count of each card value (ace first, tens last) in a full shoe."""
+    return (4 * number_of_decks,) * 9 + (16 * number_of_decks,)
+
+
+def remove_card(composition: tuple[int, ...], value: int) -> tuple[int, ...]:
+    """Composition with one card of the given value taken out."""
+    if composition[value - 1] == 0:
+        raise ValueError("No card of that value left in the shoe.")
+    return composition[:value - 1] + (composition[value - 1] - 1,) + composition[value:]
+
+
+def _outcome(state: int) -> int:
+    if hand_states.is_bust(state):
+        return BUST
+    if hand_states.is_blackjack(state):
+        return BLACKJACK
+    return hand_states.score(state) - 17
+
+
+@lru_cache(maxsize=None)
+def _finishes(state: int, hits_soft_17: bool) -> dict[tuple[tuple[int, ...], int], int]:
+    """
+    Every way a dealer hand in the state can be finished, as the count of each
+    value drawn and the outcome, mapped to the number of orders of drawing them.
+    These do not depend on the shoe, so they are worked out once per state.
+    """
+    if hand_states.is_bust(state) or (hand_states.number_of_cards(state) >= 2
+                                      and not DRAWS[hits_soft_17][state]):
+        return {((0,) * 10, _outcome(state)): 1}
+    finishes = {}
+    for value in range(1, 11):
+        following = _finishes(hand_states.step(state, value), hits_soft_17)
+        for (drawn, outcome), orders in following.items():
+            key = (drawn[:value - 1] + (drawn[value - 1] + 1,) + drawn[value:], outcome)
+            finishes[key] = finishes.get(key, 0) + orders
+    return finishes
+
+
+@lru_cache(maxsize=None)
+def _finish_table(upcard: int, hits_soft_17: bool) -> tuple:
+    """
+    The finishes from the upcard as arrays: drawn counts, number drawn, outcome
+    and orders. With NumPy the drawn counts are flat indexes into a table of
+    10 rows (one per value) of MAX_DRAWN + 1 falling factorials.
+    """
+    finishes = _finishes(hand_states.step(hand_states.START, upcard), hits_soft_17)
+    drawn = [key[0] for key in finishes]
+    outcomes = [key[1] for key in finishes]
+    orders = list(finishes.values())
+    if np is None:
+        return drawn, [sum(counts) for counts in drawn], outcomes, orders
+    drawn = np.array(drawn, dtype=np.intp)
+    flat = drawn + np.arange(10) * (MAX_DRAWN + 1)
+    return flat, drawn.sum(axis=1), np.array(outcomes), np.array(orders, dtype=float)
+
+
+def _falling(n: int, k: int) -> float:
+    """n * (n - 1) * ... * (n - k + 1), the number of ordered draws of k from n cards."""
+    result = 1.0
+    for i in range(k):
+        result *= n - i
+    return result
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _distribution(upcard: int, composition: tuple[int, ...], hits_soft_17: bool) -> tuple[float, ...]:
+    # An ordered draw of the same cards always has the same chance, whatever the
+    # order: the falling factorials of the drawn counts over that of the shoe size.
+    drawn, sizes, outcomes, orders = _finish_table(upcard, hits_soft_17)
+    remaining = sum(composition)
+    if np is None:
+        distribution = [0.0] * len(OUTCOMES)
+        for counts, size, outcome, number in zip(drawn, sizes, outcomes, orders):
+            probability = number / _falling(remaining, size)
+            for value, count in enumerate(counts):
+                if count:
+                    probability *= _falling(composition[value], count)
+            distribution[outcome] += probability
+        return tuple(distribution)
+    counts = np.array(composition, dtype=float)[:, None] - np.arange(MAX_DRAWN)
+    falling = np.ones((10, MAX_DRAWN + 1))
+    np.cumprod(np.maximum(counts, 0), axis=1, out=falling[:, 1:])
+    longest = sizes.max() + 1
+    shoe = np.ones(longest)
+    np.cumprod(np.maximum(remaining - np.arange(longest - 1), 0), out=shoe[1:])
+    # A shoe too small for a finish has no ordered draws of it
+    shoe[shoe == 0] = np.inf
+    probabilities = falling.ravel()[drawn].prod(axis=1) * orders / shoe[sizes]
+    return tuple(np.bincount(outcomes, weights=probabilities, minlength=len(OUTCOMES)).tolist())
+
+
+def dealer_distribution(upcard: int, composition: tuple[int, ...], hits_soft_17: bool = None) -> tuple[float, ...]:
+    """
+    Exact probability of each dealer outcome in OUTCOMES, given the upcard's
+    value (ace is 1) and the count of each value left in the shoe, ace first.
+    The composition must not include the upcard. Results are kept in an LRU
+    cache keyed by upcard, composition and rule. A shoe too small to finish
+    the dealer's hand in some orders gives probabilities adding up to less
+    than one.
+    """
+    if upcard < 1 or upcard > 10:
+        raise ValueError("Invalid upcard value passed.")
+    if len(composition) != 10:
+        raise ValueError("Composition needs a count for each of the 10 values.")
+    if hits_soft_17 is None:
+        hits_soft_17 = Settings.DEALER_HITS_SOFT_17
+    return _distribution(upcard, tuple(composition), hits_soft_17)
+
+
+def clear_cache() -> None:
+    _distribution.cache_clear()
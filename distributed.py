@@ -0,0 +1,190 @@
+from simulation import SimulationResult, seed_stream, simulate
+import json
+import socket
+import socketserver
+import threading
+import time
+
+
+# A coordinator splits a run into work units of unit_rounds rounds each. Unit
+# i plays on its own table seeded by seed_stream(seed, i), so the merged result
+# is the same whichever workers play the units and in whatever order.
+#
+# Workers talk to the coordinator over TCP in JSON lines. A worker sends
+# {"type": "request"} and is answered with a unit to play, {"type": "wait"}
+# while every unit left is out with another worker, or {"type": "done"}. It
+# sends back {"type": "result", "unit": i, "result": {...}}, the result's
+# totals, and is answered {"type": "ok"}. A message the coordinator cannot
+# take is answered {"type": "error", "message": ...}. A unit not returned
+# within the timeout is handed out again; only the first result for each unit
+# is kept, so a slow or dead worker never counts twice.
+
+
+class Coordinator():
+    """Hands out work units over TCP and merges the results that come back."""
+
+    def __init__(self, rounds: int, seed: int, unit_rounds: int = 10000, number_of_players: int = 1,
+                 number_of_decks: int = 1, timeout: float = 60.0, host: str = "127.0.0.1",
+                 port: int = 0):
+        if unit_rounds < 1:
+            raise ValueError("Work units need at least one round.")
+        self.__seed = seed
+        self.__number_of_players = number_of_players
+        self.__number_of_decks = number_of_decks
+        self.__timeout = timeout
+        self.__units = [min(unit_rounds, rounds - start)
+                        for start in range(0, rounds, unit_rounds)]
+        self.__deadlines = {}
+        self.__pending = list(range(len(self.__units)))
+        self.__results = {}
+        self.__lock = threading.Lock()
+        self.__finished = threading.Event()
+        if not self.__units:
+            self.__finished.set()
+        self.__server = socketserver.ThreadingTCPServer(
+            (host, port), self.__handler_class())
+        self.__server.daemon_threads = True
+        self.__thread = threading.Thread(
+            target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+
+    def __handler_class(self):
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        reply = coordinator.handle_message(json.loads(line))
+                    except ValueError as error:
+                        reply = {"type": "error", "message": str(error)}
+                    self.wfile.write(json.dumps(reply).encode() + b"\n")
+                    self.wfile.flush()
+
+        return Handler
+
+    def get_address(self) -> tuple[str, int]:
+        return self.__server.server_address
+
+    def handle_message(self, message: dict) -> dict:
+        """Answer one message from a worker. Messages which are not valid raise ValueError."""
+        if not isinstance(message, dict):
+            raise ValueError("Invalid message.")
+        if message.get("type") == "request":
+            return self.lease()
+        if message.get("type") == "result":
+            unit = message.get("unit")
+            if type(unit) is not int:
+                raise ValueError("Invalid work unit.")
+            self.complete(unit, SimulationResult.from_totals(message.get("result")))
+            return {"type": "ok"}
+        raise ValueError("Invalid message type.")
+
+    def lease(self) -> dict:
+        """The next unit to play, reclaiming any whose worker has timed out."""
+        with self.__lock:
+            if self.__finished.is_set():
+                return {"type": "done"}
+            now = time.monotonic()
+            for unit, deadline in list(self.__deadlines.items()):
+                if deadline < now:
+                    del self.__deadlines[unit]
+                    self.__pending.append(unit)
+            if not self.__pending:
+                return {"type": "wait"}
+            unit = self.__pending.pop(0)
+            self.__deadlines[unit] = now + self.__timeout
+            return {"type": "unit", "unit": unit, "rounds": self.__units[unit],
+                    "seed": seed_stream(self.__seed, unit),
+                    "players": self.__number_of_players, "decks": self.__number_of_decks}
+
+    def complete(self, unit: int, result: SimulationResult) -> None:
+        """Keep the first result for a unit and ignore any repeats."""
+        with self.__lock:
+            if unit in self.__results or unit < 0 or unit >= len(self.__units):
+                return
+            if result.rounds != self.__units[unit]:
+                raise ValueError("Result does not cover the work unit.")
+            self.__results[unit] = result
+            self.__deadlines.pop(unit, None)
+            if unit in self.__pending:
+                self.__pending.remove(unit)
+            if len(self.__results) == len(self.__units):
+                self.__finished.set()
+
+    def wait(self, timeout: float = None) -> SimulationResult:
+        """Block until every unit is in, then merge them in unit order."""
+        if not self.__finished.wait(timeout):
+            raise TimeoutError("Work units are still out.")
+        result = SimulationResult()
+        for unit in range(len(self.__units)):
+            result.merge(self.__results[unit])
+        return result
+
+    def close(self) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+
+def run_worker(host: str, port: int, poll: float = 0.1) -> int:
+    """
+    Play work units from a coordinator on headless tables until it has none
+    left. Returns the number of units played.
+    """
+    played = 0
+    with socket.create_connection((host, port)) as connection:
+        stream = connection.makefile("rwb")
+
+        def send(message: dict) -> dict:
+            stream.write(json.dumps(message).encode() + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+        while True:
+            reply = send({"type": "request"})
+            if reply["type"] == "done":
+                return played
+            if reply["type"] == "wait":
+                time.sleep(poll)
+                continue
+            result = simulate(reply["rounds"], reply["seed"],
+                              reply["players"], reply["decks"])
+            reply = send({"type": "result", "unit": reply["unit"],
+                          "result": result.get_totals()})
+            if reply["type"] == "error":
+                raise ValueError(f"Coordinator refused a result: {reply['message']}")
+            played += 1
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Spread a simulation over worker processes or machines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    coordinate = commands.add_parser("coordinate")
+    coordinate.add_argument("--rounds", type=int, default=1000000)
+    coordinate.add_argument("--seed", type=int, default=0)
+    coordinate.add_argument("--unit-rounds", type=int, default=10000)
+    coordinate.add_argument("--players", type=int, default=1)
+    coordinate.add_argument("--decks", type=int, default=1)
+    coordinate.add_argument("--timeout", type=float, default=60.0)
+    coordinate.add_argument("--host", default="0.0.0.0")
+    coordinate.add_argument("--port", type=int, default=5555)
+    work = commands.add_parser("work")
+    work.add_argument("--host", default="127.0.0.1")
+    work.add_argument("--port", type=int, default=5555)
+    args = parser.parse_args()
+    if args.command == "work":
+        print(f"played {run_worker(args.host, args.port)} units")
+    else:
+        coordinator = Coordinator(args.rounds, args.seed, args.unit_rounds, args.players,
+                                  args.decks, args.timeout, args.host, args.port)
+        print(f"coordinating on port {coordinator.get_address()[1]}")
+        result = coordinator.wait()
+        # Let workers polling for more hear that the run is done
+        time.sleep(1)
+        coordinator.close()
+        print(f"rounds {result.rounds}, hands {result.hands}")
+        print(f"EV per hand {result.get_ev_per_hand():+.4f} "
+              f"(standard error {result.get_standard_error():.4f})")
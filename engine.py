@@ -0,0 +1,243 @@
+from cards import Hand
+from random import Random
+from has_hands import Player, Dealer
+from rng import MersenneTwister
+from shoe import Shoe
+from strategies import DealerStrategy
+from settings import Settings
+
+
+class Engine():
+    """
+    Plays rounds of blackjack without any rendering or user input.
+
+    The show_* and choose_action methods are hooks which a client (such as the
+    interactive game in blackjack.py) can override to draw the table and ask a
+    person for their decisions.
+    """
+
+    def __init__(self, players: list[Player] = None, number_of_decks: int = 1, seed: int = None,
+                 shoe_class=Shoe, shoe_pool=None, rng=None):
+        if shoe_pool is not None and not hasattr(shoe_class, "load"):
+            raise ValueError("Shoe pools need a shoe class with load().")
+        self.number_of_decks = number_of_decks
+        self.shoe_class = shoe_class
+        self.shoe_pool = shoe_pool
+        self.rng = rng
+        self.random = Random(seed)
+        self.deck = None
+        self.players = [] if players is None else players
+        self.dealer = Dealer()
+        self.default_strategy = DealerStrategy()
+
+    # ---------- HOOKS ----------
+
+    def show_card_dealing(self, can_proceed: bool) -> None:
+        """Called after each card is dealt, and once more when dealing is complete."""
+        return None
+
+    def choose_action(self, player: Player, hand: Hand) -> str:
+        """
+        Return the action the player takes with the hand, from the player's
+        strategy. Players without one use default_strategy.
+        """
+        strategy = player.get_strategy() or self.default_strategy
+        actions = player.get_action_choices()
+        action = strategy(hand, self.dealer.upcard(), actions)
+        if action not in actions:
+            raise ValueError("Action not allowed.")
+        return action
+
+    def show_player_turn_end(self, player: Player) -> None:
+        """Called once the player has no active hands left."""
+        return None
+
+    def show_dealer_turn(self, can_proceed: bool) -> None:
+        """Called before and after each dealer card, and once the dealer is finished."""
+        return None
+
+    # ---------- ROUND ----------
+
+    def prepare_deck(self) -> None:
+        """
+        Shuffle the shoe before the first round and once the cut card has come
+        out. The same shoe, with the same random source, is reused each time.
+        With a shoe_pool, the next ready-shuffled order is loaded instead.
+        """
+        if self.deck is None:
+            self.deck = self.make_shoe()
+        elif not self.deck.needs_shuffle():
+            return
+        if self.shoe_pool is not None:
+            order = self.shoe_pool.get()
+            self.deck.load(order)
+            self.shoe_pool.recycle(order)
+        else:
+            self.deck.shuffle()
+
+    def make_shoe(self):
+        """
+        A new shoe of shoe_class drawing from the rng source, or by default from
+        one Mersenne Twister seeded from the engine, so the same seed deals the
+        same shoes.
+        """
+        rng = self.rng
+        if rng is None:
+            rng = MersenneTwister(self.random.getrandbits(64))
+        return self.shoe_class(self.number_of_decks, rng=rng)
+
+    def get_state(self) -> dict:
+        """
+        The engine's random stream and shoe, which can be pickled. Restored with
+        set_state() on an engine built the same way, it deals the same rounds
+        from there on. Purses and strategies are not included.
+        """
+        deck = None if self.deck is None else self.deck.get_state()
+        return {"random": self.random.getstate(), "deck": deck}
+
+    def set_state(self, state: dict) -> None:
+        if state["deck"] is None:
+            self.deck = None
+        else:
+            if self.deck is None:
+                self.deck = self.make_shoe()
+            self.deck.set_state(state["deck"])
+        self.random.setstate(state["random"])
+
+    def collect_cards(self) -> None:
+        """Move the round's cards to the discard tray."""
+        self.deck.discard()
+
+    def deal_initial_hands(self) -> None:
+        """
+        Simulates dealing cards to each player and the dealer.
+        """
+        # First, clear last round and give each player and dealer an empty hand with bet
+        for player in self.players:
+            player.reset()
+            player.give_hand(Hand())
+        self.dealer.reset()
+        self.dealer.give_hand(Hand())
+
+    def take_bets(self) -> None:
+        for player in self.players:
+            player.place_bet(player.get_next_hand(), Settings.MINIMUM_BET)
+
+    def deal_cards(self) -> None:
+        # Next, go through each player and give cards to hand
+        self.show_card_dealing(False)
+        for _ in range(2):
+            for person in self.players + [self.dealer]:
+                hand = person.get_next_hand()
+                person.hit(hand, self.deck)
+                self.show_card_dealing(False)
+        self.show_card_dealing(True)
+
+    def player_turn(self, player: Player) -> None:
+        """
+        Complete a round for a player, where they can make decisions about what to do.
+        """
+        while player.get_next_hand() is not None:
+            hand: Hand = player.get_next_hand()
+            # Check the hand is not a blackjack from draw
+            if hand.is_blackjack():
+                hand.deactivate()
+                continue
+            # Get player action and commit action
+            action = self.choose_action(player, hand)
+            # Actions
+            if action == "hit":
+                player.hit(hand, self.deck)
+            elif action == "stick":
+                player.stick(hand)
+            elif action == "split":
+                player.split(hand, self.deck)
+            elif action == "double-down":
+                player.double_down(hand, self.deck)
+            else:
+                raise ValueError("Invalid action chosen.")
+        self.show_player_turn_end(player)
+
+    def dealer_should_play(self) -> bool:
+        """
+        Check whether the dealer's turn should be completed. Dealer's turn not completed if:
+        1) All hands are bust
+        2) All hands are blackjacks and dealer has no chance of blackjack
+        """
+        busts = []
+        blackjacks = []
+        for player in self.players:
+            for hand in player.get_hands():
+                busts.append(hand.is_bust())
+                blackjacks.append(hand.is_blackjack())
+        # Check if all busts
+        if all(busts):
+            return False
+        # Check if all blackjacks and dealer can't have blackjack
+        if all(blackjacks) and self.dealer.upcard().get_rank() != "A":
+            return False
+        return True
+
+    def dealer_turn(self) -> None:
+        """
+        Complete a round for the dealer.
+        """
+        dealer_hand = self.dealer.get_next_hand()
+        self.show_dealer_turn(False)
+        while self.dealer.should_hit(dealer_hand):
+            self.dealer.hit(dealer_hand, self.deck)
+            self.show_dealer_turn(False)
+        dealer_hand.deactivate()
+        self.show_dealer_turn(True)
+
+    def settle_hand(self, hand: Hand) -> tuple[str, int]:
+        """
+        Compare a player's hand with the dealer's hand. Returns the outcome
+        ("win", "lose" or "push") and the amount the player gets back.
+        """
+        dealer_hand = self.dealer.get_hands()[0]
+        bet = hand.get_bet()
+        if hand.is_bust():
+            return "lose", 0
+        if hand.is_blackjack():
+            if dealer_hand.is_blackjack():
+                return "push", bet
+            return "win", bet + bet * 3 // 2
+        if dealer_hand.is_blackjack():
+            return "lose", 0
+        if dealer_hand.is_bust() or hand.get_score() > dealer_hand.get_score():
+            return "win", 2 * bet
+        if hand.get_score() == dealer_hand.get_score():
+            return "push", bet
+        return "lose", 0
+
+    def settle(self) -> list[tuple[str, int]]:
+        """
+        Pay out every player's hands. Returns the outcome and net result of each
+        hand, in seat order.
+        """
+        results = []
+        for player in self.players:
+            for hand in player.get_hands():
+                outcome, payout = self.settle_hand(hand)
+                player.pay(payout)
+                results.append((outcome, payout - hand.get_bet()))
+        return results
+
+    def play_round(self) -> list[tuple[str, int]]:
+        # Shuffle deck if the cut card has come out
+        self.prepare_deck()
+        # Deal initial hands and take initial bets
+        self.deal_initial_hands()
+        self.take_bets()
+        # Deal cards
+        self.deal_cards()
+        # Iterate through player turns
+        for player in self.players:
+            self.player_turn(player)
+        # Decide whether dealer should have turn
+        if self.dealer_should_play():
+            self.dealer_turn()
+        results = self.settle()
+        self.collect_cards()
+        return results
@@ -0,0 +1,91 @@
+from cards import Card, Hand
+from array import array
+
+
+# A hand is summarised by its hard total (aces counted as 1), whether it holds
+# an ace (the soft flag) and its number of cards, which is all the rules in
+# cards.Hand look at. Each summary has a state index, and drawing a card is a
+# lookup in TRANSITIONS. Every bust hand shares the single BUST state.
+
+# Card counts stop at five, the most a player's hand can hold
+MAX_CARDS = 5
+HARD_TOTALS = 22
+NUMBER_OF_STATES = HARD_TOTALS * 2 * (MAX_CARDS + 1) + 1
+BUST = NUMBER_OF_STATES - 1
+
+# Blackjack value of each card code
+CODE_VALUES = bytes(Card.from_code(code).get_value() for code in range(52))
+
+
+def state_index(hard_total: int, soft: bool, number_of_cards: int) -> int:
+    if hard_total >= HARD_TOTALS:
+        return BUST
+    number_of_cards = min(number_of_cards, MAX_CARDS)
+    return (hard_total * 2 + soft) * (MAX_CARDS + 1) + number_of_cards
+
+
+START = state_index(0, False, 0)
+
+
+def _build_tables() -> tuple[array, bytes, bytes, bytes]:
+    transitions = array("H", [BUST] * (NUMBER_OF_STATES * 10))
+    scores = bytearray([22] * NUMBER_OF_STATES)
+    softs = bytearray(NUMBER_OF_STATES)
+    blackjacks = bytearray(NUMBER_OF_STATES)
+    for hard_total in range(HARD_TOTALS):
+        for soft in (False, True):
+            for number_of_cards in range(MAX_CARDS + 1):
+                state = state_index(hard_total, soft, number_of_cards)
+                counts_eleven = soft and hard_total <= 11
+                scores[state] = hard_total + 10 * counts_eleven
+                softs[state] = counts_eleven
+                blackjacks[state] = number_of_cards == 2 and scores[state] == 21
+                for value in range(1, 11):
+                    transitions[state * 10 + value - 1] = state_index(
+                        hard_total + value, soft or value == 1, number_of_cards + 1)
+    return transitions, bytes(scores), bytes(softs), bytes(blackjacks)
+
+
+TRANSITIONS, SCORES, SOFTS, BLACKJACKS = _build_tables()
+
+
+def step(state: int, value: int) -> int:
+    """State after drawing a card of the given blackjack value (ace is 1)."""
+    return TRANSITIONS[state * 10 + value - 1]
+
+
+def step_code(state: int, code: int) -> int:
+    """State after drawing the card with the given code."""
+    return TRANSITIONS[state * 10 + CODE_VALUES[code] - 1]
+
+
+def from_hand(hand: Hand) -> int:
+    state = START
+    for card in hand.get_cards():
+        state = step(state, card.get_value())
+    return state
+
+
+def score(state: int) -> int:
+    """Score of the state, with 22 standing for every bust hand."""
+    return SCORES[state]
+
+
+def is_soft(state: int) -> bool:
+    return SOFTS[state] == 1
+
+
+def is_bust(state: int) -> bool:
+    return state == BUST
+
+
+def is_blackjack(state: int) -> bool:
+    return BLACKJACKS[state] == 1
+
+
+def number_of_cards(state: int) -> int:
+    """
+    Number of cards in the state, where MAX_CARDS means that many or more.
+    The count of the BUST state is not kept.
+    """
+    return state % (MAX_CARDS + 1)
@@ -50,16 +50,19 @@ class HasHands():
 
 class Player(HasHands):
 
-    def __init__(self, name: str, purse: int):
+    def __init__(self, name: str, purse: int, strategy=None):
         if not isinstance(name, str):
             raise ValueError("Name must be a string.")
         if name == "":
             raise ValueError("Name cannot be empty.")
         if not isinstance(purse, int):
             raise ValueError("Purse amount must be an integer.")
+        if strategy is not None and not callable(strategy):
+            raise ValueError("Strategy must be callable.")
         super().__init__()
         self.__name = name
         self.__purse = purse
+        self.__strategy = strategy
 
     def get_name(self):
         return self.__name
@@ -67,9 +70,20 @@ class Player(HasHands):
     def get_purse(self):
         return self.__purse
 
+    def get_strategy(self):
+        """The strategy deciding this player's actions, or None if a person decides."""
+        return self.__strategy
+
     def get_split_count(self) -> int:
         return self.split_count
 
+    def place_bet(self, hand: Hand, bet: int) -> None:
+        hand.set_bet(bet)
+        self.__purse -= bet
+
+    def pay(self, amount: int) -> None:
+        self.__purse += amount
+
     def can_split(self, hand: Hand):
         # Check player has enough money
         if self.__purse < hand.get_bet():
@@ -123,3 +137,10 @@ class Dealer(HasHands):
 
     def hole_card(self):
         return self.hands[0].get_card_by_index(0)
+
+    def should_hit(self, hand: Hand) -> bool:
+        """Dealer draws below 17, and on soft 17 if Settings.DEALER_HITS_SOFT_17."""
+        score = hand.get_score()
+        if score == 17 and Settings.DEALER_HITS_SOFT_17:
+            return hand.is_soft()
+        return score < 17
@@ -0,0 +1,148 @@
+from array import array
+from random import Random
+import hashlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# A random source is one numbered stream of a seed. Every backend can shuffle
+# a shoe's byte array in place, draw integers, and hand out other streams of
+# the same seed with jumped() and split(), so tables and workers each get their
+# own reproducible stream from one generator.
+
+
+def seed_stream(master_seed: int, index: int) -> int:
+    """
+    Derive the seed of the index-th random stream from a master seed. Streams
+    are independent of each other and the same for the same master seed.
+    """
+    digest = hashlib.sha256(f"{master_seed}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class _Source():
+    """What every backend shares: its seed and stream, and sources for the streams after it."""
+
+    def __init__(self, seed: int, stream: int):
+        if stream < 0:
+            raise ValueError("Invalid stream passed.")
+        self.__seed = seed
+        self.__stream = stream
+
+    def get_seed(self) -> int:
+        return self.__seed
+
+    def get_stream(self) -> int:
+        return self.__stream
+
+    def jumped(self, jumps: int = 1) -> "_Source":
+        """A fresh source for the stream jumps further on."""
+        return type(self)(self.__seed, self.__stream + jumps)
+
+    def split(self, n: int) -> list["_Source"]:
+        """Fresh sources for this stream and the n - 1 after it."""
+        return [self.jumped(i) for i in range(n)]
+
+
+class MersenneTwister(_Source):
+    """
+    Python's own generator. Stream 0 is random.Random(seed), so it shuffles
+    exactly as Shoe.shuffle(seed) always has. Python has no jump-ahead for it,
+    so other streams are seeded from a hash of the seed and stream number.
+    """
+
+    NAME = "mt19937"
+    ID = 0
+
+    def __init__(self, seed: int = None, stream: int = 0):
+        super().__init__(seed, stream)
+        if stream == 0 or seed is None:
+            self.__random = Random(seed)
+        else:
+            self.__random = Random(seed_stream(seed, stream))
+
+    def shuffle(self, codes: array) -> None:
+        self.__random.shuffle(codes)
+
+    def randrange(self, n: int) -> int:
+        return self.__random.randrange(n)
+
+    def get_state(self):
+        """The generator's position in its stream, which can be pickled."""
+        return self.__random.getstate()
+
+    def set_state(self, state) -> None:
+        self.__random.setstate(state)
+
+    def getrandbits(self, k: int) -> int:
+        return self.__random.getrandbits(k)
+
+
+class _NumPySource(_Source):
+    """
+    A NumPy bit generator. Stream k starts k jumps on from the seed's first
+    state, so streams never overlap. Shuffles run in C over the shoe's own
+    buffer, without copying it.
+    """
+
+    NAME = None
+    ID = None
+
+    def __init__(self, seed: int = None, stream: int = 0):
+        if np is None:
+            raise ImportError(f"The {self.NAME} generator needs NumPy installed.")
+        super().__init__(seed, stream)
+        bit_generator = self._bit_generator(seed)
+        if stream:
+            bit_generator = bit_generator.jumped(stream)
+        self.__generator = np.random.Generator(bit_generator)
+
+    def _bit_generator(self, seed: int):
+        raise NotImplementedError
+
+    def shuffle(self, codes: array) -> None:
+        self.__generator.shuffle(np.frombuffer(codes, dtype=np.uint8))
+
+    def randrange(self, n: int) -> int:
+        return int(self.__generator.integers(n))
+
+    def get_state(self) -> dict:
+        """The generator's position in its stream, which can be pickled."""
+        return self.__generator.bit_generator.state
+
+    def set_state(self, state: dict) -> None:
+        self.__generator.bit_generator.state = state
+
+    def getrandbits(self, k: int) -> int:
+        if k < 1 or k > 64:
+            raise ValueError("Can only draw 1 to 64 bits at a time.")
+        return int(self.__generator.integers(1 << k, dtype=np.uint64))
+
+
+class PCG64(_NumPySource):
+    NAME = "pcg64"
+    ID = 1
+
+    def _bit_generator(self, seed: int):
+        return np.random.PCG64(seed)
+
+
+class Philox(_NumPySource):
+    NAME = "philox"
+    ID = 2
+
+    def _bit_generator(self, seed: int):
+        return np.random.Philox(seed)
+
+
+BACKENDS = {source.NAME: source for source in (MersenneTwister, PCG64, Philox)}
+
+
+def make(name: str, seed: int = None, stream: int = 0):
+    """The named backend's source for a stream of the seed."""
+    if name not in BACKENDS:
+        raise ValueError("Invalid random backend passed.")
+    return BACKENDS[name](seed, stream)
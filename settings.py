@@ -6,3 +6,5 @@ class Settings():
     MAX_DECK_PACKS = 5
     MAX_PLAYERS = 5
     MAX_SPLITS = 3
+    DEALER_HITS_SOFT_17 = False
+    PENETRATION = 0.75
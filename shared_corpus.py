@@ -0,0 +1,97 @@
+from array import array
+from multiprocessing import shared_memory
+from rng import MersenneTwister
+from settings import Settings
+from rng import seed_stream
+import struct
+
+
+# Layout of a corpus segment: a header, then each shoe's card codes in turn
+MAGIC = b"BJSC"
+HEADER = struct.Struct("<4sBI")
+
+
+def iter_shoe_orders(shoes: int, seed: int, number_of_decks: int = 1):
+    """
+    Shuffled shoe orders as arrays of card codes. The i-th is the order a Deck
+    or Shoe of the same packs deals after shuffle(seed_stream(seed, i)), so any
+    shoe can be rebuilt from the seed alone.
+    """
+    codes = array("B", range(52)) * number_of_decks
+    for i in range(shoes):
+        order = array("B", codes)
+        MersenneTwister(seed_stream(seed, i)).shuffle(order)
+        yield order
+
+
+class SharedCorpus():
+    """
+    Shuffled shoe orders stored once in shared memory as packed card codes,
+    one byte a card. Worker processes attach to the segment by name and read
+    shoes through read-only memoryviews, so the corpus is never pickled or
+    copied however many processes replay it. The process that created the
+    corpus unlinks it; the others only close it.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self.__memory = memory
+        self.__owner = owner
+        magic, number_of_decks, shoes = HEADER.unpack_from(memory.buf)
+        if magic != MAGIC:
+            raise ValueError("Not a shoe corpus.")
+        self.__number_of_decks = number_of_decks
+        self.__shoes = shoes
+        self.__shoe_size = 52 * number_of_decks
+        self.__view = memory.buf.toreadonly()
+
+    @classmethod
+    def create(cls, shoes: int, seed: int, number_of_decks: int = 1) -> "SharedCorpus":
+        """
+        Build a corpus in a new segment from iter_shoe_orders(), so it holds
+        the same shoes as comparison.shoe_corpus().
+        """
+        if number_of_decks < 1 or number_of_decks > Settings.MAX_DECK_PACKS:
+            raise ValueError("Invalid number of decks passed.")
+        if shoes < 1:
+            raise ValueError("A corpus needs at least one shoe.")
+        size = 52 * number_of_decks
+        memory = shared_memory.SharedMemory(create=True, size=HEADER.size + shoes * size)
+        HEADER.pack_into(memory.buf, 0, MAGIC, number_of_decks, shoes)
+        for i, order in enumerate(iter_shoe_orders(shoes, seed, number_of_decks)):
+            offset = HEADER.size + i * size
+            memory.buf[offset:offset + size] = order
+        return cls(memory, True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedCorpus":
+        """Open a corpus another process created, read-only."""
+        return cls(shared_memory.SharedMemory(name=name), False)
+
+    def get_name(self) -> str:
+        return self.__memory.name
+
+    def get_number_of_decks(self) -> int:
+        return self.__number_of_decks
+
+    def __len__(self) -> int:
+        return self.__shoes
+
+    def shoe(self, index: int) -> memoryview:
+        """A read-only view of one shoe's codes, dealt from the end like a Shoe."""
+        if index < 0 or index >= self.__shoes:
+            raise IndexError("No shoe at that index.")
+        offset = HEADER.size + index * self.__shoe_size
+        return self.__view[offset:offset + self.__shoe_size]
+
+    def close(self) -> None:
+        """Detach from the segment, and free it if this process created it."""
+        self.__view.release()
+        self.__memory.close()
+        if self.__owner:
+            self.__memory.unlink()
+
+    def __enter__(self) -> "SharedCorpus":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,360 @@
+from settings import Settings
+from cards import Card
+from array import array
+from rng import MersenneTwister
+import counting
+
+
+# The shared Card for each code, where code = suit index * 13 + rank index
+CARDS = tuple(Card.from_code(code) for code in range(52))
+
+
+class BaseShoe():
+    """
+    What the shoes share: the packs they are built from, the running count
+    with a tag table from counting.py, and the random source they draw from.
+    Each shoe adds its own pick_code(), shuffle(), discard() and remaining(),
+    and its own part of the state.
+    """
+
+    def __init__(self, number_of_decks: int, tags: tuple[int, ...], rng):
+        if not isinstance(number_of_decks, int):
+            raise ValueError("Invalid number of decks passed.")
+        if number_of_decks < 1 or number_of_decks > Settings.MAX_DECK_PACKS:
+            raise ValueError("Invalid number of decks passed.")
+        self._size = len(CARDS) * number_of_decks
+        self._tags = counting.tags_by_code(tags)
+        self._running_count = 0
+        self._random = MersenneTwister() if rng is None else rng
+
+    @staticmethod
+    def _cut_penetration(penetration: float) -> float:
+        if penetration is None:
+            penetration = Settings.PENETRATION
+        if penetration <= 0 or penetration > 1:
+            raise ValueError("Penetration must be above 0 and at most 1.")
+        return penetration
+
+    def _reseed(self, seed: int) -> None:
+        """Start a new Mersenne Twister from the seed, as Deck.shuffle() does."""
+        if seed is not None:
+            self._random = MersenneTwister(seed)
+
+    def pick_code(self) -> int:
+        raise NotImplementedError
+
+    def pick(self) -> Card:
+        return CARDS[self.pick_code()]
+
+    def remaining(self) -> int:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        return self._size
+
+    def get_state(self) -> dict:
+        """Everything needed to carry on dealing exactly where the shoe is, which can be pickled."""
+        state = self._get_state()
+        state.update({"size": self._size, "running_count": self._running_count,
+                      "random": self._random.get_state()})
+        return state
+
+    def set_state(self, state: dict) -> None:
+        """Restore a state from get_state() of the same kind of shoe, size and random backend."""
+        if state["size"] != self._size:
+            raise ValueError("Shoe state is the wrong size.")
+        self._set_state(state)
+        self._running_count = state["running_count"]
+        self._random.set_state(state["random"])
+
+    def _get_state(self) -> dict:
+        raise NotImplementedError
+
+    def _set_state(self, state: dict) -> None:
+        raise NotImplementedError
+
+    def get_running_count(self) -> int:
+        return self._running_count
+
+    def get_decks_remaining(self) -> float:
+        return self.remaining() / 52
+
+    def get_true_count(self) -> float:
+        """Running count per deck remaining, or 0 when the shoe is empty."""
+        remaining = self.remaining()
+        if remaining == 0:
+            return 0.0
+        return self._running_count * 52 / remaining
+
+
+class Shoe(BaseShoe):
+    """
+    A shoe of one or more packs, stored as card codes in a byte array with a
+    draw cursor. Cards are drawn from the end, so a Shoe deals the same cards
+    as a Deck of the same number of packs shuffled with the same seed.
+
+    The buffer also holds the cards already drawn: those between the cursor and
+    the start of the round are in play, and the rest make up the discard tray.
+    A cut card placed at the penetration tells the table when to reshuffle.
+
+    Shuffles draw from rng, a random source from rng.py, unless shuffle() is
+    given a seed.
+    """
+
+    def __init__(self, number_of_decks: int, tags: tuple[int, ...] = counting.HI_LO,
+                 penetration: float = None, rng=None):
+        super().__init__(number_of_decks, tags, rng)
+        penetration = BaseShoe._cut_penetration(penetration)
+        self.__codes = array("B", range(len(CARDS))) * number_of_decks
+        self.__cursor = self._size
+        self.__round_start = self._size
+        self.__cut = self._size - int(self._size * penetration)
+
+    def pick_code(self) -> int:
+        if self.__cursor == 0:
+            self.__recycle_discards()
+        self.__cursor -= 1
+        code = self.__codes[self.__cursor]
+        self._running_count += self._tags[code]
+        return code
+
+    def shuffle(self, seed: int = None) -> None:
+        """
+        Returns every drawn card to the shoe and randomizes the order in place.
+        A seed starts a new Mersenne Twister, as Deck.shuffle() does; without
+        one the shoe's random source carries on.
+        """
+        self.__cursor = self._size
+        self.__round_start = self._size
+        self._running_count = 0
+        self._reseed(seed)
+        self._random.shuffle(self.__codes)
+
+    def load(self, codes) -> None:
+        """
+        Copy a ready-shuffled order of the same shoe into the buffer, in place
+        of shuffle(). The order can be any buffer of byte codes, such as an
+        array or a memoryview of shared memory.
+        """
+        if len(codes) != self._size:
+            raise ValueError("Shoe order is the wrong size.")
+        with memoryview(self.__codes) as buffer:
+            buffer[:] = codes
+        self.__cursor = self._size
+        self.__round_start = self._size
+        self._running_count = 0
+
+    def discard(self) -> None:
+        """Move the cards in play to the discard tray, at the end of a round."""
+        self.__round_start = self.__cursor
+
+    def _get_state(self) -> dict:
+        return {"codes": self.__codes.tobytes(), "cursor": self.__cursor,
+                "round_start": self.__round_start}
+
+    def _set_state(self, state: dict) -> None:
+        self.__codes[:] = array("B", state["codes"])
+        self.__cursor = state["cursor"]
+        self.__round_start = state["round_start"]
+
+    def needs_shuffle(self) -> bool:
+        """Whether the cut card has come out."""
+        return self.__cursor <= self.__cut
+
+    def __recycle_discards(self) -> None:
+        """
+        Shuffle the discard tray back in when the shoe runs out mid-round,
+        keeping the cards in play at the end of the buffer.
+        """
+        tray = self._size - self.__round_start
+        if tray == 0:
+            raise ValueError("Taking card from empty deck.")
+        in_play = self.__codes[:self.__round_start]
+        self.__codes[:tray] = self.__codes[self.__round_start:]
+        self.__codes[tray:] = in_play
+        for i in range(tray - 1, 0, -1):
+            j = self._random.randrange(i + 1)
+            self.__codes[i], self.__codes[j] = self.__codes[j], self.__codes[i]
+        self.__cursor = tray
+        self.__round_start = self._size
+        # Only the cards in play have been seen since the tray went back in
+        self._running_count = sum(self._tags[code] for code in in_play)
+
+    def remaining(self) -> int:
+        return self.__cursor
+
+    def remaining_codes(self) -> memoryview:
+        """The codes still to be drawn, without copying them. Valid until the next draw."""
+        return memoryview(self.__codes)[:self.__cursor]
+
+
+class ContinuousShuffler(BaseShoe):
+    """
+    A continuous shuffling machine: every card is drawn at random from the
+    reservoir, and discard() puts the round's cards straight back in. Drawing
+    swaps the chosen card to the end of the reservoir, so it takes the same
+    time however big the shoe is and the shoe is never reshuffled in full.
+    """
+
+    def __init__(self, number_of_decks: int, tags: tuple[int, ...] = counting.HI_LO, rng=None):
+        super().__init__(number_of_decks, tags, rng)
+        self.__codes = array("B", range(len(CARDS))) * number_of_decks
+        self.__available = self._size
+
+    def pick_code(self) -> int:
+        if self.__available == 0:
+            raise ValueError("Taking card from empty deck.")
+        codes = self.__codes
+        chosen = self._random.randrange(self.__available)
+        self.__available -= 1
+        last = self.__available
+        codes[chosen], codes[last] = codes[last], codes[chosen]
+        code = codes[last]
+        self._running_count += self._tags[code]
+        return code
+
+    def shuffle(self, seed: int = None) -> None:
+        """Returns every card to the reservoir, and reseeds the machine's draws if given a seed."""
+        self.__available = self._size
+        self._running_count = 0
+        self._reseed(seed)
+
+    def discard(self) -> None:
+        """Put the round's cards back into the reservoir."""
+        self.__available = self._size
+        self._running_count = 0
+
+    def _get_state(self) -> dict:
+        return {"codes": self.__codes.tobytes(), "available": self.__available}
+
+    def _set_state(self, state: dict) -> None:
+        self.__codes[:] = array("B", state["codes"])
+        self.__available = state["available"]
+
+    def needs_shuffle(self) -> bool:
+        """A shuffling machine never stops for a full shuffle."""
+        return False
+
+    def remaining(self) -> int:
+        return self.__available
+
+    def remaining_codes(self) -> memoryview:
+        """The codes still in the reservoir, without copying them. Valid until the next draw."""
+        return memoryview(self.__codes)[:self.__available]
+
+
+class PermutedShoe(BaseShoe):
+    """
+    A shoe which is never laid out or shuffled. The k-th card drawn is found by
+    passing k through a keyed Feistel permutation of the shoe's positions, so
+    shuffle() only picks new keys and a round pays just for the cards it uses.
+    Positions hold the packs in Deck order.
+
+    If the shoe runs out mid-round, the cards discarded in earlier rounds are
+    laid out and the rest of the round is drawn through a new permutation of
+    them, and the shoe then asks to be shuffled.
+    """
+
+    ROUNDS = 6
+
+    def __init__(self, number_of_decks: int, tags: tuple[int, ...] = counting.HI_LO,
+                 penetration: float = None, rng=None):
+        super().__init__(number_of_decks, tags, rng)
+        penetration = BaseShoe._cut_penetration(penetration)
+        self.__cut = int(self._size * penetration)
+        self.__keys = (0,) * PermutedShoe.ROUNDS
+        self.__drawn = 0
+        self.__round_start = 0
+        # The discard tray's codes once it has been drawn from, else None
+        self.__tray = None
+        self.__set_domain(self._size)
+
+    def __set_domain(self, domain: int) -> None:
+        self.__domain = domain
+        # Each Feistel half holds enough bits that the two cover the domain
+        self.__half_bits = (max(domain - 1, 1).bit_length() + 1) // 2
+        self.__half_mask = (1 << self.__half_bits) - 1
+
+    def position(self, index: int) -> int:
+        """Position of the index-th card drawn since the last shuffle (in the tray, after a recycle)."""
+        bits = self.__half_bits
+        mask = self.__half_mask
+        while True:
+            # Cycle-walk: positions past the end of the shoe go round again
+            left, right = index >> bits, index & mask
+            for key in self.__keys:
+                # Round function: an integer hash of the right half and key
+                x = ((right ^ key) * 0x45D9F3B) & 0xFFFFFFFF
+                x = ((x ^ (x >> 16)) * 0x45D9F3B) & 0xFFFFFFFF
+                left, right = right, left ^ ((x ^ (x >> 16)) & mask)
+            index = (left << bits) | right
+            if index < self.__domain:
+                return index
+
+    def __code_at(self, index: int) -> int:
+        if self.__tray is None:
+            return self.position(index) % len(CARDS)
+        return self.__tray[self.position(index)]
+
+    def pick_code(self) -> int:
+        if self.__drawn == self.__domain:
+            self.__recycle_discards()
+        code = self.__code_at(self.__drawn)
+        self.__drawn += 1
+        self._running_count += self._tags[code]
+        return code
+
+    def __recycle_discards(self) -> None:
+        """Carry on a round from a new permutation of the discard tray."""
+        if self.__round_start == 0 or self.__tray is not None:
+            raise ValueError("Taking card from empty deck.")
+        tray = array("B", (self.__code_at(i) for i in range(self.__round_start)))
+        # Only the cards in play have been seen since the tray went back in
+        self._running_count = sum(self._tags[self.__code_at(i)]
+                                  for i in range(self.__round_start, self.__drawn))
+        self.__new_keys()
+        self.__tray = tray
+        self.__set_domain(len(tray))
+        self.__drawn = 0
+        self.__round_start = 0
+
+    def __new_keys(self) -> None:
+        self.__keys = tuple(self._random.getrandbits(32)
+                            for _ in range(PermutedShoe.ROUNDS))
+
+    def shuffle(self, seed: int = None) -> None:
+        """Returns every drawn card and picks a new permutation, from the seed if given one."""
+        self._reseed(seed)
+        self.__new_keys()
+        self.__tray = None
+        self.__set_domain(self._size)
+        self.__drawn = 0
+        self.__round_start = 0
+        self._running_count = 0
+
+    def discard(self) -> None:
+        """Drawn cards stay out of the shoe until the next shuffle, unless a round runs out."""
+        self.__round_start = self.__drawn
+
+    def _get_state(self) -> dict:
+        tray = None if self.__tray is None else self.__tray.tobytes()
+        return {"keys": self.__keys, "drawn": self.__drawn,
+                "round_start": self.__round_start, "tray": tray}
+
+    def _set_state(self, state: dict) -> None:
+        self.__keys = tuple(state["keys"])
+        self.__drawn = state["drawn"]
+        self.__round_start = state["round_start"]
+        if state["tray"] is None:
+            self.__tray = None
+            self.__set_domain(self._size)
+        else:
+            self.__tray = array("B", state["tray"])
+            self.__set_domain(len(self.__tray))
+
+    def needs_shuffle(self) -> bool:
+        """Whether the cut card has come out, or the shoe has run out."""
+        return self.__tray is not None or self.__drawn >= self.__cut
+
+    def remaining(self) -> int:
+        return self.__domain - self.__drawn
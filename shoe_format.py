@@ -0,0 +1,122 @@
+from cards import Card, Deck
+from settings import Settings
+import mmap
+import struct
+
+
+# A shoe record is a header followed by one byte for each card, its code
+# (suit index * 13 + rank index), in the order a Deck stores them: the last
+# byte is dealt first. The header holds the number of packs the shoe was
+# made from, the seed and the ID of the rng.py backend that shuffled it (or
+# NO_RNG when the order did not come from a seeded shuffle), and the number
+# of cards, at least one, as a Deck is never empty. Records can be written
+# one after another into an archive file.
+MAGIC = b"BJSH"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBQH")
+NO_RNG = 255
+
+
+class ShoeRecord():
+    """
+    A shoe read from a buffer. The codes are a memoryview into that buffer,
+    so reading a record copies nothing until the cards are asked for.
+    """
+
+    def __init__(self, codes: memoryview, number_of_decks: int, seed: int, rng_id: int):
+        self.codes = codes
+        self.number_of_decks = number_of_decks
+        self.seed = None if rng_id == NO_RNG else seed
+        self.rng_id = None if rng_id == NO_RNG else rng_id
+
+    def get_size(self) -> int:
+        """Bytes the record takes up, header included."""
+        return HEADER.size + len(self.codes)
+
+    def get_cards(self) -> list[Card]:
+        return [Card.from_code(code) for code in self.codes]
+
+    def to_deck(self) -> Deck:
+        """A Deck which deals exactly these cards."""
+        return Deck(cards=self.get_cards())
+
+
+def dumps(codes, number_of_decks: int, seed: int = None, rng_id: int = None) -> bytes:
+    """One shoe record from card codes, such as Deck.get_codes() or Shoe.remaining_codes()."""
+    if number_of_decks < 1 or number_of_decks > Settings.MAX_DECK_PACKS:
+        raise ValueError("Invalid number of decks passed.")
+    if len(codes) == 0:
+        raise ValueError("A shoe record needs at least one card.")
+    if len(codes) > 52 * number_of_decks:
+        raise ValueError("More cards than the packs hold.")
+    if max(codes, default=0) >= 52:
+        raise ValueError("Invalid card code.")
+    if (seed is None) != (rng_id is None):
+        raise ValueError("A seed needs the ID of the rng that used it.")
+    if rng_id is None:
+        seed, rng_id = 0, NO_RNG
+    elif seed < 0 or seed >= 2 ** 64 or rng_id < 0 or rng_id >= NO_RNG:
+        raise ValueError("Seed or rng ID out of range.")
+    header = HEADER.pack(MAGIC, VERSION, rng_id, number_of_decks, seed, len(codes))
+    return header + bytes(codes)
+
+
+def dump_deck(deck: Deck, number_of_decks: int, seed: int = None, rng_id: int = None) -> bytes:
+    """One shoe record of the cards left in a Deck."""
+    return dumps(deck.get_codes(), number_of_decks, seed, rng_id)
+
+
+def loads(buffer, offset: int = 0) -> ShoeRecord:
+    """Read the record at offset in any buffer (bytes, bytearray, mmap) without copying it."""
+    view = memoryview(buffer)
+    if len(view) - offset < HEADER.size:
+        raise ValueError("Shoe record is cut short.")
+    magic, version, rng_id, number_of_decks, seed, length = HEADER.unpack_from(view, offset)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a shoe record.")
+    if length == 0:
+        raise ValueError("A shoe record needs at least one card.")
+    start = offset + HEADER.size
+    if len(view) - start < length:
+        raise ValueError("Shoe record is cut short.")
+    return ShoeRecord(view[start:start + length], number_of_decks, seed, rng_id)
+
+
+def iter_records(buffer):
+    """Every record in a buffer of records written one after another."""
+    offset = 0
+    while offset < len(buffer):
+        record = loads(buffer, offset)
+        offset += record.get_size()
+        yield record
+
+
+def write_archive(path: str, records: list[bytes]) -> None:
+    """Write records from dumps() into one archive file."""
+    with open(path, "wb") as file:
+        for record in records:
+            file.write(record)
+
+
+class ShoeArchive():
+    """
+    An archive file, mapped into memory. Records read from it are views of
+    the mapping, so large archives are never read in whole. Drop the records
+    before closing the archive.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.__data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __iter__(self):
+        return iter_records(self.__data)
+
+    def close(self) -> None:
+        self.__data.close()
+
+    def __enter__(self) -> "ShoeArchive":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
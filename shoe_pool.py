@@ -0,0 +1,84 @@
+from array import array
+from random import Random
+from settings import Settings
+import queue
+import threading
+
+
+class ShoePool():
+    """
+    Keeps a bounded queue of shuffled shoe orders, filled by a background
+    thread, so a table can load its next shoe without waiting for a shuffle.
+    Orders come out in the same sequence for the same seed, and at most
+    size + 1 order buffers exist at once: give each one back with recycle()
+    once it has been loaded.
+    """
+
+    def __init__(self, number_of_decks: int, seed: int, size: int = 4):
+        if not isinstance(number_of_decks, int):
+            raise ValueError("Invalid number of decks passed.")
+        if number_of_decks < 1 or number_of_decks > Settings.MAX_DECK_PACKS:
+            raise ValueError("Invalid number of decks passed.")
+        if size < 1:
+            raise ValueError("Pool must hold at least one shoe.")
+        self.__base = array("B", range(52)) * number_of_decks
+        self.__random = Random(seed)
+        self.__ready = queue.Queue(maxsize=size)
+        self.__free = queue.SimpleQueue()
+        self.__buffers = size + 1
+        # Orders handed out by get() and not yet given back
+        self.__out = 0
+        for _ in range(self.__buffers):
+            self.__free.put(array("B", self.__base))
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__fill, daemon=True)
+        self.__thread.start()
+
+    def __fill(self) -> None:
+        while not self.__stop.is_set():
+            try:
+                order = self.__free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            # Start each shuffle from the same order, so reused buffers shuffle the same
+            order[:] = self.__base
+            self.__random.shuffle(order)
+            while not self.__stop.is_set():
+                try:
+                    self.__ready.put(order, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def get(self) -> array:
+        """
+        The next shuffled shoe order, waiting for the thread if none is ready.
+        Raises ValueError once the pool is closed, even while waiting, and if
+        every buffer is out so no order could ever come.
+        """
+        if self.__out == self.__buffers:
+            raise ValueError("Every shoe order is out; recycle() one first.")
+        while True:
+            if self.__stop.is_set():
+                raise ValueError("Shoe pool is closed.")
+            try:
+                order = self.__ready.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.__out += 1
+            return order
+
+    def recycle(self, order: array) -> None:
+        """Give back an order's buffer to be shuffled again."""
+        self.__out -= 1
+        self.__free.put(order)
+
+    def close(self) -> None:
+        self.__stop.set()
+        self.__thread.join()
+
+    def __enter__(self) -> "ShoePool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,405 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from engine import Engine
+from has_hands import Player
+from rng import seed_stream
+from settings import Settings
+from shoe import Shoe, ContinuousShuffler
+from statistics import NormalDist
+from variance_reduction import METHODS, VarianceReduction, bust_probability, mirror
+import math
+import os
+import pickle
+import rng
+
+
+# Purses start large enough that splits and double-downs are never refused
+SIMULATION_PURSE = 10 ** 12
+
+
+class SimulationResult():
+    """
+    Totals of a batch of simulated rounds, which can be merged with other
+    batches. Given a variance reduction method, the result also keeps that
+    method's sums in reduction.
+    """
+
+    # The counts a result is made of, which workers send over the network
+    TOTALS = ("rounds", "hands", "wins", "losses", "pushes", "net_total", "net_squares")
+
+    def __init__(self, method: str = None):
+        self.reduction = None if method is None else VarianceReduction(method)
+        self.rounds = 0
+        self.hands = 0
+        self.wins = 0
+        self.losses = 0
+        self.pushes = 0
+        self.net_total = 0
+        self.net_squares = 0
+
+    def add_round(self, results: list[tuple[str, int]]) -> None:
+        self.rounds += 1
+        for outcome, net in results:
+            self.hands += 1
+            if outcome == "win":
+                self.wins += 1
+            elif outcome == "lose":
+                self.losses += 1
+            else:
+                self.pushes += 1
+            self.net_total += net
+            self.net_squares += net * net
+
+    def merge(self, other: "SimulationResult") -> None:
+        self.rounds += other.rounds
+        self.hands += other.hands
+        self.wins += other.wins
+        self.losses += other.losses
+        self.pushes += other.pushes
+        self.net_total += other.net_total
+        self.net_squares += other.net_squares
+        if other.reduction is not None:
+            if self.reduction is None:
+                self.reduction = VarianceReduction(other.reduction.method)
+            self.reduction.merge(other.reduction)
+
+    def get_totals(self) -> dict:
+        return {name: getattr(self, name) for name in SimulationResult.TOTALS}
+
+    @classmethod
+    def from_totals(cls, totals: dict) -> "SimulationResult":
+        """A result from get_totals(), which must hold exactly TOTALS, each an integer."""
+        if not isinstance(totals, dict) or set(totals) != set(cls.TOTALS):
+            raise ValueError("Invalid result totals.")
+        if not all(type(totals[name]) is int for name in cls.TOTALS):
+            raise ValueError("Invalid result totals.")
+        result = cls()
+        vars(result).update(totals)
+        return result
+
+    def get_ev_per_hand(self) -> float:
+        """Mean net result of a hand, as a fraction of the minimum bet."""
+        if self.hands == 0:
+            return 0.0
+        return self.net_total / self.hands / Settings.MINIMUM_BET
+
+    def get_variance_per_hand(self) -> float:
+        """Sample variance of a hand's net result, in minimum bets squared."""
+        if self.hands < 2:
+            return math.inf
+        mean = self.net_total / self.hands
+        variance = (self.net_squares - mean * self.net_total) / (self.hands - 1)
+        return max(variance, 0.0) / Settings.MINIMUM_BET ** 2
+
+    def get_standard_error(self) -> float:
+        """
+        Standard error of get_ev_per_hand(). Hands are treated as independent,
+        which slightly understates it when seats share a round.
+        """
+        if self.hands < 2:
+            return math.inf
+        return math.sqrt(self.get_variance_per_hand() / self.hands)
+
+    def get_interval_width(self, confidence: float = 0.95) -> float:
+        """Full width of the normal confidence interval around get_ev_per_hand()."""
+        return 2 * NormalDist().inv_cdf((1 + confidence) / 2) * self.get_standard_error()
+
+    def get_bankroll_drift(self) -> float:
+        """Mean change in the table's combined purses per round."""
+        if self.rounds == 0:
+            return 0.0
+        return self.net_total / self.rounds
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SimulationResult) and vars(self) == vars(other)
+
+
+class RecordingEngine(Engine):
+    """
+    An engine which keeps what a variance reduction method needs from each
+    round. As the dealer's turn starts, with the control method, it works out
+    the exact chance of the dealer busting from the cards not yet seen. With
+    antithetic, each shoe is followed by its mirror before the next shuffle.
+    Shoes are numbered from 0 in shoe.
+    """
+
+    def __init__(self, players: list[Player], number_of_decks: int, seed: int, shoe_class,
+                 source, method: str):
+        needs = {"antithetic": ("load", "remaining_codes"), "control": ("remaining_codes",)}
+        if not all(hasattr(shoe_class, name) for name in needs.get(method, ())):
+            raise ValueError(f"The {method} method cannot use this shoe class.")
+        super().__init__(players, number_of_decks, seed, shoe_class, rng=source)
+        self.method = method
+        self.shoe = -1
+        self.twin = None
+        self.bust_probability = None
+
+    def prepare_deck(self) -> None:
+        if self.deck is not None and not self.deck.needs_shuffle():
+            return
+        self.shoe += 1
+        if self.twin is not None:
+            self.deck.load(self.twin)
+            self.twin = None
+            return
+        super().prepare_deck()
+        if self.method == "antithetic":
+            self.twin = mirror(self.deck.remaining_codes())
+
+    def show_dealer_turn(self, can_proceed: bool) -> None:
+        if self.method == "control" and self.bust_probability is None:
+            self.bust_probability = bust_probability(
+                self.dealer.upcard().get_value(), self.deck.remaining_codes(),
+                self.dealer.hole_card().get_value())
+
+    def play_round(self) -> list[tuple[str, int]]:
+        self.bust_probability = None
+        return super().play_round()
+
+    def get_control(self) -> float:
+        """Whether the dealer bust last round less the chance of it, or 0 if the dealer did not play."""
+        if self.bust_probability is None:
+            return 0.0
+        return self.dealer.get_hands()[0].is_bust() - self.bust_probability
+
+    def get_state(self) -> dict:
+        state = super().get_state()
+        state.update({"shoe": self.shoe,
+                      "twin": None if self.twin is None else self.twin.tobytes()})
+        return state
+
+    def set_state(self, state: dict) -> None:
+        super().set_state(state)
+        self.shoe = state["shoe"]
+        self.twin = None if state["twin"] is None else array("B", state["twin"])
+
+
+def make_engine(seed: int, number_of_players: int, number_of_decks: int, strategy=None,
+                shoe_class=Shoe, source=None, method: str = None) -> Engine:
+    players = [Player(f"Player {i + 1}", SIMULATION_PURSE, strategy)
+               for i in range(number_of_players)]
+    if method is None:
+        return Engine(players, number_of_decks, seed, shoe_class, rng=source)
+    return RecordingEngine(players, number_of_decks, seed, shoe_class, source, method)
+
+
+def play_round(engine: Engine, result: SimulationResult) -> None:
+    """Play a round and add it to the result, and to its method's sums if it has one."""
+    results = engine.play_round()
+    result.add_round(results)
+    if result.reduction is not None:
+        value = sum(net for _, net in results) / len(engine.players) / Settings.MINIMUM_BET
+        result.reduction.add_round(value, engine.dealer.upcard().get_value(),
+                                   engine.get_control(), engine.shoe)
+
+
+CHECKPOINT_VERSION = 1
+
+
+def write_checkpoint(path: str, run: tuple, result: SimulationResult, engine: Engine) -> None:
+    """
+    Save a table's totals and random state. The file is written beside the
+    old one and then swapped in, so a kill never leaves half a checkpoint.
+    """
+    checkpoint = {"version": CHECKPOINT_VERSION, "run": run,
+                  "result": vars(result), "engine": engine.get_state()}
+    with open(path + ".tmp", "wb") as file:
+        pickle.dump(checkpoint, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def read_checkpoint(path: str, run: tuple, engine: Engine) -> SimulationResult:
+    """Restore the engine from a checkpoint of the same run, and return its totals."""
+    with open(path, "rb") as file:
+        checkpoint = pickle.load(file)
+    if checkpoint["version"] != CHECKPOINT_VERSION or checkpoint["run"] != run:
+        raise ValueError("Checkpoint is for a different run.")
+    result = SimulationResult()
+    vars(result).update(checkpoint["result"])
+    engine.set_state(checkpoint["engine"])
+    return result
+
+
+def simulate(rounds: int, seed: int, number_of_players: int = 1, number_of_decks: int = 1,
+             strategy=None, shoe_class=Shoe, rng_name: str = None, stream: int = 0,
+             checkpoint: str = None, checkpoint_every: int = 100000,
+             method: str = None) -> SimulationResult:
+    """
+    Play rounds on one headless table in this process. With an rng_name from
+    rng.BACKENDS, the table shuffles from that stream of the seed. Given a
+    checkpoint path, the table saves its progress there every checkpoint_every
+    rounds and carries on from the file if it already exists, giving the same
+    result as a run that was never stopped. With a method from
+    variance_reduction.METHODS, the result also keeps that method's estimate.
+    Strategies must keep no state.
+    """
+    source = None if rng_name is None else rng.make(rng_name, seed, stream)
+    engine = make_engine(seed, number_of_players, number_of_decks,
+                         strategy, shoe_class, source, method)
+    run = (rounds, seed, number_of_players, number_of_decks,
+           shoe_class.__name__, rng_name, stream, method)
+    if checkpoint is not None and os.path.exists(checkpoint):
+        result = read_checkpoint(checkpoint, run, engine)
+    else:
+        result = SimulationResult(method)
+    while result.rounds < rounds:
+        play_round(engine, result)
+        if checkpoint is not None and result.rounds % checkpoint_every == 0:
+            write_checkpoint(checkpoint, run, result, engine)
+    if result.reduction is not None:
+        result.reduction.close()
+    return result
+
+
+def run_simulation(rounds: int, seed: int, workers: int = None, number_of_players: int = 1,
+                   number_of_decks: int = 1, strategy=None, shoe_class=Shoe,
+                   rng_name: str = None, checkpoint: str = None,
+                   checkpoint_every: int = 100000, method: str = None) -> SimulationResult:
+    """
+    Spread the rounds over a pool of worker processes and merge their results.
+    Each worker plays its share with its own stream from seed_stream(), so the
+    result only depends on the seed and the number of workers. The strategy
+    is used for every seat and must be picklable. shoe_class picks a hand
+    shuffled Shoe or a ContinuousShuffler. With an rng_name, worker i instead
+    shuffles from stream i of the seed on that backend. Given a checkpoint
+    path, worker i keeps its own checkpoint at that path with ".i" added, and
+    a run restarted with the same arguments resumes from them. A method from
+    variance_reduction.METHODS is used on every worker.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("At least one worker is needed.")
+    shares = [rounds // workers + (1 if i < rounds % workers else 0)
+              for i in range(workers)]
+    if rng_name is None:
+        seeds = [seed_stream(seed, i) for i in range(workers)]
+    else:
+        seeds = [seed] * workers
+    checkpoints = [None if checkpoint is None else f"{checkpoint}.{i}"
+                   for i in range(workers)]
+    result = SimulationResult(method)
+    if workers == 1:
+        result.merge(simulate(shares[0], seeds[0], number_of_players,
+                     number_of_decks, strategy, shoe_class, rng_name, 0,
+                     checkpoints[0], checkpoint_every, method))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(simulate, shares, seeds,
+                            [number_of_players] * workers, [number_of_decks] * workers,
+                            [strategy] * workers, [shoe_class] * workers,
+                            [rng_name] * workers, range(workers),
+                            checkpoints, [checkpoint_every] * workers, [method] * workers)
+        for partial in partials:
+            result.merge(partial)
+    return result
+
+
+def run_until(width: float, seed: int, batch_rounds: int = 10000, max_rounds: int = None,
+              workers: int = 1, confidence: float = 0.95, number_of_players: int = 1,
+              number_of_decks: int = 1, strategy=None, shoe_class=Shoe,
+              rng_name: str = None, method: str = None) -> SimulationResult:
+    """
+    Play batches of rounds until the confidence interval on EV per hand is no
+    wider than width (in minimum bets), or max_rounds have been played. With a
+    method from variance_reduction.METHODS, the interval is the method's, on
+    EV per round for each seat. Batch i plays on its own table seeded by
+    seed_stream(seed, i), or with an rng_name, shuffles from stream i of the
+    seed on that backend. Batches are merged and checked in order, so the
+    result does not depend on the number of workers; batches a pool finishes
+    past the stopping point are dropped.
+    """
+    if width <= 0:
+        raise ValueError("Interval width must be positive.")
+    if batch_rounds < 1:
+        raise ValueError("Batches need at least one round.")
+    if workers < 1:
+        raise ValueError("At least one worker is needed.")
+    result = SimulationResult(method)
+
+    def done() -> bool:
+        if max_rounds is not None and result.rounds >= max_rounds:
+            return True
+        if result.reduction is not None:
+            return result.reduction.get_interval_width(confidence) <= width
+        return result.get_interval_width(confidence) <= width
+
+    def batch_sizes(first: int, count: int) -> list[int]:
+        if max_rounds is None:
+            return [batch_rounds] * count
+        left = max_rounds - first * batch_rounds
+        return [max(min(batch_rounds, left - i * batch_rounds), 0) for i in range(count)]
+
+    batch = 0
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while not done():
+            sizes = batch_sizes(batch, workers)
+            streams = range(batch, batch + workers)
+            if rng_name is None:
+                seeds = [seed_stream(seed, stream) for stream in streams]
+            else:
+                seeds = [seed] * workers
+            args = (sizes, seeds, [number_of_players] * workers, [number_of_decks] * workers,
+                    [strategy] * workers, [shoe_class] * workers, [rng_name] * workers, streams,
+                    [None] * workers, [0] * workers, [method] * workers)
+            partials = map(simulate, *args) if pool is None else pool.map(simulate, *args)
+            for partial in partials:
+                if done():
+                    break
+                result.merge(partial)
+                batch += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Simulate headless rounds.")
+    parser.add_argument("--rounds", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--csm", action="store_true",
+                        help="deal from a continuous shuffling machine")
+    parser.add_argument("--rng", choices=sorted(rng.BACKENDS), default=None,
+                        help="shuffle from one stream per worker, or per batch, of this generator")
+    parser.add_argument("--ci-width", type=float, default=None,
+                        help="stop once the 95%% interval on EV per hand is this wide; "
+                             "--rounds becomes the most to play")
+    parser.add_argument("--batch", type=int, default=10000,
+                        help="rounds between checks of --ci-width")
+    parser.add_argument("--checkpoint", default=None,
+                        help="save progress to files with this prefix, and resume from them")
+    parser.add_argument("--checkpoint-every", type=int, default=100000)
+    parser.add_argument("--method", choices=METHODS, default=None,
+                        help="also estimate EV per round with this variance reduction method, "
+                             "whose interval --ci-width then applies to")
+    args = parser.parse_args()
+    shoe_class = ContinuousShuffler if args.csm else Shoe
+    if args.ci_width is None:
+        result = run_simulation(args.rounds, args.seed, args.workers,
+                                args.players, args.decks, shoe_class=shoe_class,
+                                rng_name=args.rng, checkpoint=args.checkpoint,
+                                checkpoint_every=args.checkpoint_every, method=args.method)
+    else:
+        result = run_until(args.ci_width, args.seed, args.batch, args.rounds,
+                           args.workers or os.cpu_count() or 1, 0.95,
+                           args.players, args.decks, shoe_class=shoe_class,
+                           rng_name=args.rng, method=args.method)
+    print(f"rounds {result.rounds}, hands {result.hands}")
+    print(f"wins {result.wins}, losses {result.losses}, pushes {result.pushes}")
+    print(f"EV per hand {result.get_ev_per_hand():+.4f} "
+          f"(standard error {result.get_standard_error():.4f})")
+    print(f"bankroll drift per round {result.get_bankroll_drift():+.2f}")
+    if result.reduction is not None:
+        reduction = result.reduction
+        print(f"{reduction.method}: EV per round per seat {reduction.get_ev():+.4f}, "
+              f"standard error {reduction.get_standard_error():.4f} "
+              f"(plain {reduction.get_plain_standard_error():.4f})")
+        print(f"variance saved {reduction.get_variance_saved():.1%}")
@@ -0,0 +1,253 @@
+from functools import lru_cache
+from settings import Settings
+from dealer_probabilities import dealer_distribution, full_composition, remove_card, BUST, BLACKJACK
+import csv
+import json
+import hand_states
+
+
+# Expected values are in units of the hand's initial bet. Split hands are
+# valued as independent hands drawn from the composition left after the split,
+# so cards one hand takes do not change the next hand's chances. Resplits are
+# counted across all the hands of a split, as Player.can_split() counts them,
+# and only a card of the pair's rank can be resplit, as in Hand.has_pair().
+
+CACHE_SIZE = 2 ** 18
+ACTIONS = ("hit", "stick", "split", "double-down")
+KINDS = ("hard", "soft", "pair")
+
+
+def _draws(composition: tuple[int, ...]):
+    """Each card value left in the shoe, its probability and the composition after it."""
+    remaining = sum(composition)
+    for value in range(1, 11):
+        count = composition[value - 1]
+        if count:
+            yield value, count / remaining, remove_card(composition, value)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _stick(state: int, composition: tuple[int, ...], upcard: int, hits_soft_17: bool) -> float:
+    if hand_states.is_bust(state):
+        return -1.0
+    dealer = dealer_distribution(upcard, composition, hits_soft_17)
+    if hand_states.is_blackjack(state):
+        return 1.5 * (1 - dealer[BLACKJACK])
+    score = hand_states.score(state)
+    ev = dealer[BUST] - dealer[BLACKJACK]
+    for total in range(17, 22):
+        if score > total:
+            ev += dealer[total - 17]
+        elif score < total:
+            ev -= dealer[total - 17]
+    return ev
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _hit(state: int, composition: tuple[int, ...], upcard: int, hits_soft_17: bool) -> float:
+    ev = 0.0
+    for value, probability, following in _draws(composition):
+        ev += probability * _after_hit(hand_states.step(state, value),
+                                       following, upcard, hits_soft_17)
+    return ev
+
+
+def _after_hit(state: int, composition: tuple[int, ...], upcard: int, hits_soft_17: bool) -> float:
+    """Best value of a hand which has just been hit: bust and five-card hands are finished."""
+    if hand_states.is_bust(state):
+        return -1.0
+    stick = _stick(state, composition, upcard, hits_soft_17)
+    if hand_states.number_of_cards(state) == hand_states.MAX_CARDS:
+        return stick
+    return max(stick, _hit(state, composition, upcard, hits_soft_17))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _double_down(state: int, composition: tuple[int, ...], upcard: int, hits_soft_17: bool) -> float:
+    ev = 0.0
+    for value, probability, following in _draws(composition):
+        ev += probability * _stick(hand_states.step(state, value),
+                                   following, upcard, hits_soft_17)
+    return 2 * ev
+
+
+def _play_evs(state: int, composition: tuple[int, ...], upcard: int, hits_soft_17: bool) -> dict[str, float]:
+    """Values of the actions other than split."""
+    evs = {
+        "hit": _hit(state, composition, upcard, hits_soft_17),
+        "stick": _stick(state, composition, upcard, hits_soft_17),
+    }
+    if hand_states.number_of_cards(state) == 2:
+        evs["double-down"] = _double_down(state, composition,
+                                          upcard, hits_soft_17)
+    return evs
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _split(pair_value: int, composition: tuple[int, ...], upcard: int, splits_left: int,
+           rank_left: float, hits_soft_17: bool) -> float:
+    """
+    Value of splitting a pair into two hands, each starting with one pair card
+    and a new card, when splits_left more splits are allowed across all the
+    hands. rank_left is the number of cards of the pair's rank in the shoe.
+    """
+    start = hand_states.step(hand_states.START, pair_value)
+    # Value of a split hand played without resplitting, and of one dealt a pair card
+    played = 0.0
+    pair_ev = 0.0
+    for value, probability, following in _draws(composition):
+        state = hand_states.step(start, value)
+        if hand_states.is_blackjack(state):
+            ev = _stick(state, following, upcard, hits_soft_17)
+        else:
+            ev = max(_play_evs(state, following, upcard, hits_soft_17).values())
+        played += probability * ev
+        if value == pair_value:
+            pair_ev = ev
+    match = min(rank_left, composition[pair_value - 1]) / sum(composition)
+    values = {}
+
+    def hands(waiting: int, splits: int) -> float:
+        """Value of the split hands still to be played, with the splits left between them."""
+        if waiting == 0:
+            return 0.0
+        if splits == 0:
+            return waiting * played
+        if (waiting, splits) not in values:
+            # Dealt a card of the pair's rank, the hand is resplit or played as it is
+            values[(waiting, splits)] = played - match * pair_ev + \
+                (1 - match) * hands(waiting - 1, splits) + \
+                match * max(hands(waiting + 1, splits - 1),
+                            pair_ev + hands(waiting - 1, splits))
+        return values[(waiting, splits)]
+
+    return hands(2, splits_left)
+
+
+def action_evs(values: list[int], upcard: int, composition: tuple[int, ...],
+               splits_left: int = None, hits_soft_17: bool = None, can_split: bool = True,
+               rank_left: float = None) -> dict[str, float]:
+    """
+    Expected value of each action Player.get_action_choices() would offer for
+    a hand of the given card values (ace is 1) against the dealer's upcard.
+    The composition is the count of each value left in the shoe, ace first,
+    without the player's cards or the upcard. A two-card 21 is a blackjack and
+    has no actions, so its value is returned under "stick".
+
+    Two cards of one value are taken to be a pair of one rank: pass can_split
+    False for tens of different ranks, such as K-Q. rank_left is the number
+    of cards of the pair's rank left; for tens it defaults to a quarter of the
+    ten-value cards, counting the pair's own two back in. Hit, stick and
+    double-down values are exact; split values are exact but for the
+    independence of the split hands.
+    """
+    if splits_left is None:
+        splits_left = Settings.MAX_SPLITS
+    if hits_soft_17 is None:
+        hits_soft_17 = Settings.DEALER_HITS_SOFT_17
+    composition = tuple(composition)
+    state = hand_states.START
+    for value in values:
+        state = hand_states.step(state, value)
+    if hand_states.is_bust(state):
+        raise ValueError("Hand is already bust.")
+    if hand_states.is_blackjack(state):
+        return {"stick": _stick(state, composition, upcard, hits_soft_17)}
+    evs = _play_evs(state, composition, upcard, hits_soft_17)
+    if can_split and splits_left > 0 and len(values) == 2 and values[0] == values[1]:
+        pair_value = values[0]
+        if rank_left is None:
+            rank_left = composition[9] / 4 - 1.5 if pair_value == 10 else composition[pair_value - 1]
+        evs["split"] = _split(pair_value, composition, upcard,
+                              splits_left - 1, rank_left, hits_soft_17)
+    return evs
+
+
+def best_actions(evs: dict[str, float]) -> tuple[str, str]:
+    """
+    The best action, and the better of hit and stick to fall back on when the
+    best action is a split or double-down that is not allowed.
+    """
+    action = max(evs, key=evs.get)
+    fallback = "hit" if evs.get("hit", -2) > evs["stick"] else "stick"
+    return action, fallback
+
+
+def chart_hands() -> list[tuple[str, int, list[int]]]:
+    """The kind, chart total and representative two cards of every chart row."""
+    hands = []
+    for total in range(5, 21):
+        cards = [2, total - 2] if total <= 11 else [10, total - 10]
+        hands.append(("hard", total, cards))
+    for other in range(2, 10):
+        hands.append(("soft", 11 + other, [1, other]))
+    for value in range(1, 11):
+        hands.append(("pair", value, [value, value]))
+    return hands
+
+
+def strategy_table(number_of_decks: int, upcards: list[int] = None,
+                   hits_soft_17: bool = None) -> dict[tuple[str, int, int], dict[str, float]]:
+    """
+    Action values for every chart row against each upcard, for a full shoe of
+    the given number of packs. Keys are (kind, total, upcard): kind is "hard",
+    "soft" or "pair", and a pair's total is the value of one of its cards.
+    """
+    if upcards is None:
+        upcards = list(range(1, 11))
+    table = {}
+    for upcard in upcards:
+        shoe = remove_card(full_composition(number_of_decks), upcard)
+        for kind, total, cards in chart_hands():
+            composition = shoe
+            for value in cards:
+                composition = remove_card(composition, value)
+            table[(kind, total, upcard)] = action_evs(
+                cards, upcard, composition, hits_soft_17=hits_soft_17,
+                can_split=kind == "pair")
+    return table
+
+
+def table_rows(table: dict[tuple[str, int, int], dict[str, float]]) -> list[dict]:
+    rows = []
+    for (kind, total, upcard), evs in sorted(table.items(), key=lambda item: (KINDS.index(item[0][0]), item[0][1:])):
+        action, fallback = best_actions(evs)
+        row = {"kind": kind, "total": total, "upcard": upcard,
+               "action": action, "fallback": fallback}
+        for name in ACTIONS:
+            row[name] = evs.get(name)
+        rows.append(row)
+    return rows
+
+
+def export_csv(table: dict[tuple[str, int, int], dict[str, float]], path: str) -> None:
+    """Write the table with one row per hand and upcard, and a column per action value."""
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(
+            file, ["kind", "total", "upcard", "action", "fallback", *ACTIONS])
+        writer.writeheader()
+        writer.writerows(table_rows(table))
+
+
+def export_json(table: dict[tuple[str, int, int], dict[str, float]], path: str) -> None:
+    with open(path, "w") as file:
+        json.dump(table_rows(table), file, indent=1)
+
+
+def clear_cache() -> None:
+    for function in (_stick, _hit, _double_down, _split):
+        function.cache_clear()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Solve a composition-dependent strategy table.")
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--output", default="strategy.csv")
+    args = parser.parse_args()
+    table = strategy_table(args.decks)
+    if args.output.endswith(".json"):
+        export_json(table, args.output)
+    else:
+        export_csv(table, args.output)
@@ -0,0 +1,139 @@
+from cards import Card, Hand
+from solver import ACTIONS
+from charts import ROWS
+import csv
+import json
+
+
+class Strategy():
+    """
+    Decides what a player does with a hand. A strategy is called with the hand,
+    the dealer's upcard and the actions Player.get_action_choices() allows, and
+    returns one of those actions. Any callable taking the same arguments can be
+    used in place of a Strategy.
+    """
+
+    def decide(self, hand: Hand, upcard: Card, actions: list[str]) -> str:
+        raise NotImplementedError
+
+    def decide_batch(self, hands: list[Hand], upcards: list[Card], actions: list[list[str]]) -> list[str]:
+        """Decide for many hands at once, such as the same seat across many tables."""
+        return [self.decide(hand, upcard, allowed)
+                for hand, upcard, allowed in zip(hands, upcards, actions)]
+
+    def __call__(self, hand: Hand, upcard: Card, actions: list[str]) -> str:
+        return self.decide(hand, upcard, actions)
+
+
+class DealerStrategy(Strategy):
+    """Copies the dealer: hit below 17, otherwise stick."""
+
+    def decide(self, hand: Hand, upcard: Card, actions: list[str]) -> str:
+        if hand.get_score() < 17:
+            return "hit"
+        return "stick"
+
+
+class ReplayStrategy(Strategy):
+    """Plays back a recorded list of actions, in order."""
+
+    def __init__(self, actions: list[str]):
+        self.__actions = list(actions)
+        self.__next = 0
+
+    def decide(self, hand: Hand, upcard: Card, actions: list[str]) -> str:
+        if self.__next == len(self.__actions):
+            raise ValueError("No recorded actions left.")
+        action = self.__actions[self.__next]
+        self.__next += 1
+        return action
+
+
+def decide_batch(strategy, hands: list[Hand], upcards: list[Card], actions: list[list[str]]) -> list[str]:
+    """Batch decisions from any strategy, looping over plain callables."""
+    if isinstance(strategy, Strategy):
+        return strategy.decide_batch(hands, upcards, actions)
+    return [strategy(hand, upcard, allowed)
+            for hand, upcard, allowed in zip(hands, upcards, actions)]
+
+
+class BasicStrategy(Strategy):
+    """
+    Plays a chart from one flat table of bytes, with a row for each hard total,
+    each soft total and each pair, and a column for each upcard. Each byte holds
+    the chart's action and the fallback for when that action is not allowed, as
+    indexes into solver.ACTIONS. Hands the chart does not cover play like the
+    dealer.
+    """
+
+    SOFT_ROWS = 22
+    PAIR_ROWS = 44
+    NUMBER_OF_ROWS = 54
+
+    def __init__(self, rows: list[dict]):
+        cells = bytearray(BasicStrategy.NUMBER_OF_ROWS * 10)
+        for row in range(BasicStrategy.NUMBER_OF_ROWS):
+            # Dealer's rule for totals the chart leaves out
+            action = ACTIONS.index(
+                "hit" if BasicStrategy.row_score(row) < 17 else "stick")
+            cells[row * 10:row * 10 + 10] = bytes([action << 4 | action]) * 10
+        for row in rows:
+            index = BasicStrategy.row_index(row["kind"], int(row["total"]))
+            cell = ACTIONS.index(row["action"]) << 4 | ACTIONS.index(row["fallback"])
+            cells[index * 10 + int(row["upcard"]) - 1] = cell
+        self.__cells = bytes(cells)
+
+    @staticmethod
+    def row_index(kind: str, total: int) -> int:
+        """Table row of a chart row: hard totals, then soft totals, then pairs by card value."""
+        if kind == "hard" and 0 <= total < BasicStrategy.SOFT_ROWS:
+            return total
+        if kind == "soft" and 0 <= total < BasicStrategy.SOFT_ROWS:
+            return BasicStrategy.SOFT_ROWS + total
+        if kind == "pair" and 1 <= total <= 10:
+            return BasicStrategy.PAIR_ROWS + total - 1
+        raise ValueError("Invalid chart row.")
+
+    @staticmethod
+    def row_score(row: int) -> int:
+        """Score of the hands in a table row."""
+        if row < BasicStrategy.PAIR_ROWS:
+            return row % BasicStrategy.SOFT_ROWS
+        value = row - BasicStrategy.PAIR_ROWS + 1
+        return 12 if value == 1 else 2 * value
+
+    @classmethod
+    def from_csv(cls, path: str) -> "BasicStrategy":
+        """Build from a chart written by solver.export_csv()."""
+        with open(path, newline="") as file:
+            return cls(list(csv.DictReader(file)))
+
+    @classmethod
+    def from_json(cls, path: str) -> "BasicStrategy":
+        """Build from a chart written by solver.export_json()."""
+        with open(path) as file:
+            return cls(json.load(file))
+
+    @classmethod
+    def from_charts(cls, charts, number_of_decks: int) -> "BasicStrategy":
+        """Build from one deck count of a charts.Charts file."""
+        rows = []
+        for kind, total in ROWS:
+            for upcard in range(1, 11):
+                action, fallback = charts.action(number_of_decks, kind, total, upcard)
+                rows.append({"kind": kind, "total": total, "upcard": upcard,
+                             "action": action, "fallback": fallback})
+        return cls(rows)
+
+    def decide(self, hand: Hand, upcard: Card, actions: list[str]) -> str:
+        if "split" in actions:
+            row = BasicStrategy.PAIR_ROWS + hand.get_card_by_index(0).get_value() - 1
+        elif hand.is_soft():
+            row = BasicStrategy.SOFT_ROWS + hand.get_score()
+        else:
+            row = hand.get_score()
+        cell = self.__cells[row * 10 + upcard.get_value() - 1]
+        action = ACTIONS[cell >> 4]
+        if action in actions:
+            return action
+        return ACTIONS[cell & 15]
@@ -1,4 +1,8 @@
 # pylint: skip-file
+from cards import Card, Deck
+from engine import Engine
+from has_hands import Player
+
 
 def player_chooses(choices: list, monkeypatch) -> None:
     """
@@ -11,3 +15,15 @@ def player_chooses(choices: list, monkeypatch) -> None:
     """
     answers = iter(choices)
     monkeypatch.setattr('builtins.input', lambda name: next(answers))
+
+
+def make_engine(cards: list[Card], players: int = 1, strategy=None) -> Engine:
+    """
+    Engine whose deck deals the given cards, first card first, to players
+    who all play the given strategy.
+    """
+    engine = Engine([Player(f"Player {i}", 100000, strategy) for i in range(players)])
+    engine.prepare_deck = lambda: setattr(
+        engine, "deck", Deck(cards=list(reversed(cards))))
+    engine.collect_cards = lambda: None
+    return engine
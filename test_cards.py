@@ -2,6 +2,7 @@ import pytest
 from support.testing_util import player_chooses
 from cards import Deck, Card, Hand
 from settings import Settings
+import counting
 
 
 # ----------- CARD -----------
@@ -29,6 +30,50 @@ def test_card_invalid_suit():
         Card("A", "P")
 
 
+def test_card_shared():
+    """__init__(): the same rank and suit always give the same card object"""
+    assert Card("A", "H") is Card("A", "H")
+    assert Card.of("A", "H") is Card("A", "H")
+
+
+def test_card_immutable():
+    """__init__(): cards cannot be changed"""
+    with pytest.raises(AttributeError):
+        Card("A", "H")._Card__rank = "K"
+
+
+def test_card_pickle_shared():
+    """__init__(): unpickled cards are the shared card objects"""
+    import pickle
+    assert pickle.loads(pickle.dumps(Card("7", "C"))) is Card("7", "C")
+
+
+def test_card_dictionary_key():
+    """__init__(): cards can be used as dictionary keys"""
+    scores = {Card("K", "S"): 10}
+    assert scores[Card.of("K", "S")] == 10
+
+
+# from_code()
+
+
+def test_card_from_code():
+    """from_code(): codes follow suit index * 13 + rank index"""
+    assert Card.from_code(0) is Card("A", "S")
+    assert Card.from_code(51) is Card("K", "C")
+    assert all(Card.from_code(code).get_code() == code for code in range(52))
+
+
+# get_value()
+
+
+def test_card_get_value():
+    """get_value(): aces count 1 and face cards count 10"""
+    assert Card("A", "D").get_value() == 1
+    assert Card("7", "D").get_value() == 7
+    assert Card("Q", "D").get_value() == 10
+
+
 # get_rank()
 
 
@@ -110,6 +155,67 @@ def test_take_card_from_deck_empty_deck():
         deck.pick()
 
 
+# get_running_count()
+
+
+def test_deck_running_count():
+    """get_running_count(): Hi-Lo count follows the cards picked"""
+    deck = Deck(cards=[Card("K", "H"), Card("7", "D"), Card("5", "C"), Card("2", "S")])
+    deck.pick()
+    deck.pick()
+    assert deck.get_running_count() == 2
+    deck.pick()
+    deck.pick()
+    assert deck.get_running_count() == 1
+
+
+def test_deck_running_count_balanced():
+    """get_running_count(): a balanced count ends at zero over a whole deck"""
+    deck = Deck(number_of_decks=2, tags=counting.OMEGA_II)
+    deck.shuffle(4)
+    for _ in range(104):
+        deck.pick()
+    assert deck.get_running_count() == 0
+
+
+def test_deck_running_count_reset_on_shuffle():
+    """shuffle(): the count starts again"""
+    deck = Deck(cards=[Card("K", "H"), Card("5", "D")])
+    deck.pick()
+    deck.shuffle(1)
+    assert deck.get_running_count() == 0
+
+
+def test_deck_invalid_tags():
+    """__init__(): tag table needs a tag for each rank"""
+    with pytest.raises(ValueError):
+        Deck(number_of_decks=1, tags=(1, 2, 3))
+
+
+# get_true_count()
+
+
+def test_deck_true_count():
+    """get_true_count(): running count per deck remaining"""
+    deck = Deck(number_of_decks=2)
+    deck._Deck__cards.sort(key=lambda card: -card.get_value())
+    for _ in range(26):
+        deck.pick()
+    assert deck.get_decks_remaining() == 1.5
+    assert deck.get_true_count() == pytest.approx(deck.get_running_count() / 1.5)
+
+
+# get_codes()
+
+
+def test_deck_get_codes():
+    """get_codes(): one byte a card, in the order the cards are stored"""
+    deck = Deck(cards=[Card("A", "S"), Card("K", "C")])
+    assert deck.get_codes() == bytes([0, 51])
+    deck.pick()
+    assert deck.get_codes() == bytes([0])
+
+
 # ----------- HAND -----------
 
 
@@ -298,6 +404,51 @@ def test_hand_get_score_empty_hand():
         Hand([]).get_score()
 
 
+def reference_score(hand: list[Card]) -> int:
+    """The original get_score() algorithm, which rebuilt the score from the ranks."""
+    ranks = ["10" if card.get_rank() in {"J", "Q", "K"} else card.get_rank()
+             for card in hand]
+    aces_quantity = ranks.count("A")
+    score = sum(int(rank) for rank in ranks if rank != "A")
+    eleven_counter = aces_quantity
+    while eleven_counter * 11 + (aces_quantity - eleven_counter) + score > 21 and eleven_counter > 0:
+        eleven_counter -= 1
+    return eleven_counter * 11 + (aces_quantity - eleven_counter) + score
+
+
+def test_hand_get_score_matches_reference():
+    """Hand.get_score(): running score agrees with the original algorithm"""
+    from itertools import combinations_with_replacement
+    ranks = [Card(rank, "S") for rank in Card.RANKS]
+    for size in range(1, 6):
+        for cards in combinations_with_replacement(ranks, size):
+            hand = Hand()
+            for card in cards:
+                hand.add_card(card)
+            assert hand.get_score() == reference_score(list(cards))
+            assert Hand(list(cards)).get_score() == reference_score(list(cards))
+
+
+def test_hand_get_score_after_pop():
+    """Hand.get_score(): score follows cards removed with pop_card()"""
+    hand = Hand([Card("A", "H"), Card("A", "D")])
+    assert hand.get_score() == 12
+    hand.pop_card()
+    assert hand.get_score() == 11
+    hand.add_card(Card("K", "D"))
+    assert hand.is_blackjack()
+
+
+# is_soft()
+
+
+def test_hand_is_soft():
+    """is_soft(): true only while an ace counts as 11"""
+    assert Hand([Card("A", "H"), Card("6", "D")]).is_soft()
+    assert not Hand([Card("A", "H"), Card("6", "D"), Card("9", "D")]).is_soft()
+    assert not Hand([Card("10", "H"), Card("6", "D")]).is_soft()
+
+
 # is_blackjack()
 
 
@@ -0,0 +1,76 @@
+import pytest
+import charts
+
+
+# ---------- CHARTS ----------
+
+
+# solve_upcard()
+
+
+def test_solve_upcard():
+    """solve_upcard(): one byte per chart row"""
+    column = charts.solve_upcard(1, 6, False)
+    assert len(column) == len(charts.ROWS)
+    cell = column[charts.ROW_INDEXES[("hard", 11)]]
+    assert (cell >> 4, cell & 15) == (3, 0)
+
+
+# write_charts() and Charts
+
+
+def make_charts(deck_counts: int) -> dict[int, list[bytes]]:
+    """Every cell is stick, except hard 16 which doubles or else hits for each deck count."""
+    made = {}
+    for decks in range(1, deck_counts + 1):
+        column = bytearray([0x11] * len(charts.ROWS))
+        column[charts.ROW_INDEXES[("hard", 16)]] = 0x30
+        made[decks] = [bytes(column)] * charts.UPCARDS
+    return made
+
+
+def test_charts_round_trip(tmp_path):
+    """Charts: cells written by write_charts() are read back"""
+    path = tmp_path / "charts.bin"
+    charts.write_charts(path, make_charts(3), True)
+    loaded = charts.Charts(path)
+    assert loaded.deck_counts() == 3
+    assert loaded.hits_soft_17()
+    assert loaded.action(2, "hard", 16, 10) == ("double-down", "hit")
+    assert loaded.action(3, "pair", 8, 1) == ("stick", "stick")
+    loaded.close()
+
+
+def test_charts_size(tmp_path):
+    """write_charts(): one byte per cell after the header"""
+    path = tmp_path / "charts.bin"
+    charts.write_charts(path, make_charts(5), False)
+    assert path.stat().st_size == charts.HEADER.size + 5 * len(charts.ROWS) * 10
+
+
+def test_charts_missing_deck_count(tmp_path):
+    """Charts: looking up a deck count without a chart raises an error"""
+    path = tmp_path / "charts.bin"
+    charts.write_charts(path, make_charts(1), False)
+    with pytest.raises(ValueError):
+        charts.Charts(path).action(2, "hard", 16, 10)
+
+
+@pytest.mark.parametrize("kind, total, upcard", [("hard", 16, 0), ("hard", 16, 11),
+                                                  ("pair", 11, 6), ("soft", 22, 6)])
+def test_charts_invalid_cell(tmp_path, kind, total, upcard):
+    """Charts: upcards and rows outside the chart raise an error"""
+    path = tmp_path / "charts.bin"
+    charts.write_charts(path, make_charts(1), False)
+    loaded = charts.Charts(path)
+    with pytest.raises(ValueError):
+        loaded.action(1, kind, total, upcard)
+    loaded.close()
+
+
+def test_charts_not_chart_file(tmp_path):
+    """Charts: other files are refused"""
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a chart file")
+    with pytest.raises(ValueError):
+        charts.Charts(path)
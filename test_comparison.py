@@ -0,0 +1,85 @@
+import pytest
+from cards import Deck
+from comparison import PairedComparison, shoe_corpus, play_shoe, compare_strategies
+from settings import Settings
+from simulation import seed_stream
+from strategies import DealerStrategy
+
+
+def stand_on_16(hand, upcard, actions):
+    return "hit" if hand.get_score() < 16 else "stick"
+
+
+# ---------- SHOE CORPUS ----------
+
+
+# shoe_corpus()
+
+
+def test_shoe_corpus_matches_deck():
+    """shoe_corpus(): each shoe deals as a Deck shuffled with its stream's seed"""
+    corpus = shoe_corpus(3, 7, 2)
+    deck = Deck(number_of_decks=2)
+    deck.shuffle(seed_stream(7, 2))
+    assert [deck.pick().get_code() for _ in range(104)] == list(reversed(corpus[2]))
+
+
+# play_shoe()
+
+
+def test_play_shoe_reproducible():
+    """play_shoe(): the same order and strategy give the same result"""
+    order = shoe_corpus(1, 3)[0]
+    hands, net = play_shoe(order, DealerStrategy())
+    assert hands > 0
+    assert (hands, net) == play_shoe(order, DealerStrategy())
+
+
+# ---------- PAIRED COMPARISON ----------
+
+
+# add_shoe()
+
+
+def test_paired_comparison_difference():
+    """add_shoe(): differences are taken shoe by shoe against the first strategy"""
+    comparison = PairedComparison(2)
+    bet = Settings.MINIMUM_BET
+    comparison.add_shoe([10, 10], [-2 * bet, 0])
+    comparison.add_shoe([10, 10], [4 * bet, 6 * bet])
+    assert comparison.get_mean_difference(1) == 2
+    assert comparison.get_paired_standard_error(1) == 0
+    assert comparison.get_independent_standard_error(1) > 0
+    assert comparison.get_ev_per_hand(1) == pytest.approx(0.3)
+
+
+def test_paired_comparison_needs_two():
+    """__init__(): one strategy has nothing to compare with"""
+    with pytest.raises(ValueError):
+        PairedComparison(1)
+
+
+# compare_strategies()
+
+
+def test_compare_strategies_same_strategy():
+    """compare_strategies(): a strategy compared with itself differs by nothing"""
+    comparison = compare_strategies([DealerStrategy(), DealerStrategy()], 20, 1)
+    assert comparison.shoes == 20
+    assert comparison.get_mean_difference(1) == 0
+    assert comparison.get_paired_standard_error(1) == 0
+
+
+def test_compare_strategies_pairing_reduces_error():
+    """compare_strategies(): pairing the shoes shrinks the standard error"""
+    comparison = compare_strategies([DealerStrategy(), stand_on_16], 200, 1)
+    assert comparison.get_paired_standard_error(1) < \
+        comparison.get_independent_standard_error(1)
+
+
+def test_compare_strategies_workers_match():
+    """compare_strategies(): workers replaying a shared corpus give the same comparison"""
+    strategies = [DealerStrategy(), stand_on_16]
+    single = compare_strategies(strategies, 30, 2)
+    shared = compare_strategies(strategies, 30, 2, workers=3)
+    assert vars(single) == vars(shared)
@@ -0,0 +1,68 @@
+import pytest
+from cards import Card, Hand
+from has_hands import Dealer
+from random import Random
+from settings import Settings
+import dealer_automaton
+import hand_states
+
+
+def play_with_dealer(values: list[int]) -> Hand:
+    """Play the values through Dealer.should_hit, as the engine does."""
+    cards = iter(Card.from_code(value - 1) for value in values)
+    hand = Hand([next(cards), next(cards)])
+    while Dealer().should_hit(hand):
+        hand.add_card(next(cards))
+    return hand
+
+
+def random_rows(number_of_rows: int) -> list[list[int]]:
+    random = Random(3)
+    return [[random.choice([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10])
+             for _ in range(12)] for _ in range(number_of_rows)]
+
+
+# ---------- DEALER AUTOMATON ----------
+
+
+# play()
+
+
+@pytest.mark.parametrize("hits_soft_17", [False, True])
+def test_play_matches_dealer(monkeypatch, hits_soft_17):
+    """play(): the table plays the same as Dealer.should_hit"""
+    monkeypatch.setattr(Settings, "DEALER_HITS_SOFT_17", hits_soft_17)
+    for values in random_rows(2000):
+        hand = play_with_dealer(values)
+        state = dealer_automaton.play(values)
+        assert hand_states.is_bust(state) == hand.is_bust()
+        if not hand.is_bust():
+            assert hand_states.score(state) == hand.get_score()
+
+
+def test_play_soft_17():
+    """play(): soft 17 stands or draws depending on the rule"""
+    values = [1, 6, 4]
+    assert hand_states.score(dealer_automaton.play(values, False)) == 17
+    assert hand_states.score(dealer_automaton.play(values, True)) == 21
+
+
+def test_play_not_enough_cards():
+    """play(): error raised when the dealer runs out of cards to draw"""
+    with pytest.raises(ValueError):
+        dealer_automaton.play([2, 3, 4])
+
+
+# play_batch()
+
+
+@pytest.mark.parametrize("hits_soft_17", [False, True])
+def test_play_batch_matches_play(hits_soft_17):
+    """play_batch(): every row agrees with play()"""
+    np = pytest.importorskip("numpy")
+    rows = random_rows(2000)
+    totals, busts = dealer_automaton.play_batch(np.array(rows), hits_soft_17)
+    for row, total, bust in zip(rows, totals, busts):
+        state = dealer_automaton.play(row, hits_soft_17)
+        assert bust == hand_states.is_bust(state)
+        assert total == hand_states.score(state)
@@ -0,0 +1,80 @@
+import pytest
+from itertools import permutations
+from dealer_probabilities import (dealer_distribution, full_composition, remove_card,
+                                  BUST, BLACKJACK)
+import dealer_automaton
+import hand_states
+
+
+def enumerate_distribution(upcard: int, values: list[int], hits_soft_17: bool) -> list[float]:
+    """Play out every ordering of the remaining cards with the dealer automaton."""
+    distribution = [0.0] * 7
+    orderings = list(permutations(values))
+    for ordering in orderings:
+        state = dealer_automaton.play([ordering[0], upcard] + list(ordering[1:]),
+                                      hits_soft_17)
+        if hand_states.is_bust(state):
+            distribution[BUST] += 1 / len(orderings)
+        elif hand_states.is_blackjack(state):
+            distribution[BLACKJACK] += 1 / len(orderings)
+        else:
+            distribution[hand_states.score(state) - 17] += 1 / len(orderings)
+    return distribution
+
+
+# ---------- DEALER PROBABILITIES ----------
+
+
+# dealer_distribution()
+
+
+@pytest.mark.parametrize("upcard", [1, 6, 10])
+@pytest.mark.parametrize("hits_soft_17", [False, True])
+def test_dealer_distribution_matches_enumeration(upcard, hits_soft_17):
+    """dealer_distribution(): agrees with playing out every ordering of a small shoe"""
+    values = [1, 2, 5, 6, 6, 9, 10, 10]
+    composition = tuple(values.count(value) for value in range(1, 11))
+    expected = enumerate_distribution(upcard, values, hits_soft_17)
+    result = dealer_distribution(upcard, composition, hits_soft_17)
+    assert result == pytest.approx(expected)
+
+
+def test_dealer_distribution_without_numpy(monkeypatch):
+    """dealer_distribution(): the pure Python path gives the same result"""
+    import dealer_probabilities
+    composition = remove_card(full_composition(1), 7)
+    expected = dealer_distribution(7, composition, True)
+    monkeypatch.setattr(dealer_probabilities, "np", None)
+    dealer_probabilities._finish_table.cache_clear()
+    dealer_probabilities.clear_cache()
+    assert dealer_distribution(7, composition, True) == pytest.approx(expected)
+    dealer_probabilities._finish_table.cache_clear()
+    dealer_probabilities.clear_cache()
+
+
+def test_dealer_distribution_sums_to_one():
+    """dealer_distribution(): outcome probabilities add up to one"""
+    composition = remove_card(full_composition(2), 6)
+    assert sum(dealer_distribution(6, composition, False)) == pytest.approx(1)
+
+
+def test_dealer_distribution_bust_six():
+    """dealer_distribution(): a dealer showing 6 busts about 42% of the time"""
+    composition = remove_card(full_composition(5), 6)
+    assert dealer_distribution(6, composition, False)[BUST] == pytest.approx(
+        0.42, abs=0.01)
+
+
+def test_dealer_distribution_invalid_upcard():
+    """dealer_distribution(): upcard must be a card value"""
+    with pytest.raises(ValueError):
+        dealer_distribution(11, full_composition(1))
+
+
+# remove_card()
+
+
+def test_remove_card_missing():
+    """remove_card(): error raised when no card of the value is left"""
+    with pytest.raises(ValueError):
+        remove_card((0,) * 10, 3)
@@ -0,0 +1,112 @@
+import json
+import multiprocessing
+import socket
+import pytest
+from distributed import Coordinator, run_worker
+from simulation import SimulationResult, seed_stream, simulate
+
+
+def local_result(rounds: int, seed: int, unit_rounds: int) -> SimulationResult:
+    """The result of playing every work unit in this process."""
+    result = SimulationResult()
+    for unit, start in enumerate(range(0, rounds, unit_rounds)):
+        result.merge(simulate(min(unit_rounds, rounds - start), seed_stream(seed, unit)))
+    return result
+
+
+def send(connection, message: dict) -> dict:
+    stream = connection.makefile("rwb")
+    stream.write(json.dumps(message).encode() + b"\n")
+    stream.flush()
+    return json.loads(stream.readline())
+
+
+# ---------- COORDINATOR ----------
+
+
+# wait()
+
+
+def test_coordinator_with_worker_processes():
+    """wait(): units played by several worker processes merge to the local result"""
+    coordinator = Coordinator(1050, 4, unit_rounds=100)
+    host, port = coordinator.get_address()
+    workers = [multiprocessing.Process(target=run_worker, args=(host, port))
+               for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    try:
+        result = coordinator.wait(timeout=60)
+    finally:
+        for worker in workers:
+            worker.join(timeout=10)
+        coordinator.close()
+    assert result == local_result(1050, 4, 100)
+
+
+def test_coordinator_retries_dead_worker():
+    """lease(): a unit whose worker vanished is handed out again after the timeout"""
+    coordinator = Coordinator(300, 4, unit_rounds=100, timeout=0.2)
+    host, port = coordinator.get_address()
+    try:
+        with socket.create_connection((host, port)) as connection:
+            assert send(connection, {"type": "request"})["unit"] == 0
+        # The first worker died holding unit 0
+        assert run_worker(host, port, poll=0.05) == 3
+        assert coordinator.wait(timeout=5) == local_result(300, 4, 100)
+    finally:
+        coordinator.close()
+
+
+# complete()
+
+
+def test_coordinator_ignores_duplicate_results():
+    """complete(): only the first result for a unit counts"""
+    coordinator = Coordinator(200, 4, unit_rounds=100)
+    try:
+        unit = coordinator.lease()
+        result = simulate(unit["rounds"], unit["seed"])
+        coordinator.complete(unit["unit"], result)
+        coordinator.complete(unit["unit"], result)
+        with pytest.raises(TimeoutError):
+            coordinator.wait(timeout=0.1)
+        other = coordinator.lease()
+        coordinator.complete(other["unit"], simulate(other["rounds"], other["seed"]))
+        assert coordinator.wait(timeout=1) == local_result(200, 4, 100)
+        assert coordinator.lease() == {"type": "done"}
+    finally:
+        coordinator.close()
+
+
+def test_coordinator_answers_bad_messages():
+    """handle_message(): malformed messages and results are answered with an error"""
+    coordinator = Coordinator(100, 4, unit_rounds=100)
+    host, port = coordinator.get_address()
+    totals = simulate(50, 1).get_totals()
+    try:
+        with socket.create_connection((host, port)) as connection:
+            stream = connection.makefile("rwb")
+            stream.write(b"not json\n")
+            stream.flush()
+            assert json.loads(stream.readline())["type"] == "error"
+            for message in ([], {"type": "shuffle"},
+                            {"type": "result", "unit": 0, "result": totals},
+                            {"type": "result", "unit": 0, "result": dict(totals, purse=1)},
+                            {"type": "result", "unit": 0, "result": {"rounds": 100}},
+                            {"type": "result", "unit": "0", "result": totals}):
+                assert send(connection, message)["type"] == "error"
+            # The connection is still open for good messages
+            assert send(connection, {"type": "request"})["unit"] == 0
+    finally:
+        coordinator.close()
+
+
+def test_coordinator_waits_while_units_out():
+    """lease(): workers are told to wait while every unit is out"""
+    coordinator = Coordinator(100, 4, unit_rounds=100)
+    try:
+        assert coordinator.lease()["type"] == "unit"
+        assert coordinator.lease() == {"type": "wait"}
+    finally:
+        coordinator.close()
@@ -0,0 +1,151 @@
+import pytest
+from cards import Card, Hand
+from engine import Engine
+from has_hands import Player
+from settings import Settings
+from support.testing_util import make_engine
+from shoe import Shoe, ContinuousShuffler, PermutedShoe
+import rng
+
+
+# ---------- ENGINE ----------
+
+
+# play_round()
+
+
+def test_play_round_no_input(monkeypatch):
+    """play_round(): a full round plays without asking for input"""
+    monkeypatch.setattr("builtins.input", lambda *args: 1 / 0)
+    engine = Engine([Player("Joe", 100000), Player("Will", 100000)], 2)
+    results = engine.play_round()
+    assert len(results) >= 2
+    assert all(outcome in ("win", "lose", "push") for outcome, _ in results)
+
+
+def test_play_round_purse_matches_results():
+    """play_round(): purses change by the net result of their hands"""
+    engine = Engine([Player("Joe", 100000)], 1)
+    results = engine.play_round()
+    assert engine.players[0].get_purse() == 100000 + \
+        sum(net for _, net in results)
+
+
+def test_play_round_resets_hands():
+    """play_round(): hands from the previous round are cleared"""
+    engine = Engine([Player("Joe", 100000)], 1)
+    engine.play_round()
+    engine.play_round()
+    assert engine.dealer.get_hands()[0].number_of_cards() >= 2
+    assert len(engine.players[0].get_hands()) == 1
+
+
+def test_play_round_win():
+    """play_round(): player 19 beats dealer 18"""
+    cards = [Card("10", "H"), Card("10", "S"),
+             Card("9", "H"), Card("8", "S")]
+    engine = make_engine(cards)
+    assert engine.play_round() == [("win", Settings.MINIMUM_BET)]
+
+
+def test_play_round_dealer_hits_to_bust():
+    """play_round(): dealer draws below 17 and busts"""
+    cards = [Card("10", "H"), Card("10", "S"), Card("8", "H"),
+             Card("6", "S"), Card("K", "D")]
+    engine = make_engine(cards)
+    assert engine.play_round() == [("win", Settings.MINIMUM_BET)]
+    assert engine.dealer.get_hands()[0].is_bust()
+
+
+def test_play_round_blackjack_pays_three_to_two():
+    """play_round(): a blackjack is paid at 3:2"""
+    cards = [Card("A", "H"), Card("10", "S"),
+             Card("K", "H"), Card("8", "S")]
+    engine = make_engine(cards)
+    assert engine.play_round() == [("win", Settings.MINIMUM_BET * 3 // 2)]
+
+
+def test_play_round_push():
+    """play_round(): equal scores push"""
+    cards = [Card("10", "H"), Card("10", "S"),
+             Card("8", "H"), Card("8", "S")]
+    engine = make_engine(cards)
+    assert engine.play_round() == [("push", 0)]
+
+
+def test_play_round_invalid_action():
+    """play_round(): an action a client hook returns is still checked"""
+    cards = [Card("10", "H"), Card("10", "S"),
+             Card("6", "H"), Card("8", "S")]
+    engine = make_engine(cards)
+    engine.choose_action = lambda player, hand: "surrender"
+    with pytest.raises(ValueError):
+        engine.play_round()
+
+
+# choose_action()
+
+
+def test_choose_action_default():
+    """choose_action(): players without a strategy hit below 17 and stick otherwise"""
+    engine = Engine()
+    engine.dealer.give_hand(Hand([Card("9", "C"), Card("7", "C")]))
+    player = Player("Joe", 100000)
+    player.give_hand(Hand([Card("10", "H"), Card("6", "S")]))
+    player.place_bet(player.get_next_hand(), Settings.MINIMUM_BET)
+    assert engine.choose_action(player, player.get_next_hand()) == "hit"
+    player.reset()
+    player.give_hand(Hand([Card("10", "H"), Card("7", "S")]))
+    player.place_bet(player.get_next_hand(), Settings.MINIMUM_BET)
+    assert engine.choose_action(player, player.get_next_hand()) == "stick"
+
+
+# prepare_deck()
+
+
+def test_prepare_deck_shuffles_at_cut_card():
+    """prepare_deck(): the shoe is only reshuffled once the cut card is out"""
+    engine = Engine([Player("Joe", 100000)], 1)
+    engine.play_round()
+    shoe = engine.deck
+    remaining = shoe.remaining()
+    engine.play_round()
+    assert engine.deck is shoe
+    assert shoe.remaining() < remaining
+    for _ in range(50):
+        engine.play_round()
+        assert shoe.remaining() > 0
+
+
+def test_prepare_deck_with_rng():
+    """prepare_deck(): tables given the same stream play the same rounds"""
+    results = []
+    for _ in range(2):
+        engine = Engine([Player("Joe", 100000)], 1, rng=rng.make("mt19937", 3, 1))
+        results.append([engine.play_round() for _ in range(20)])
+    assert results[0] == results[1]
+
+
+def test_prepare_deck_keeps_one_source():
+    """prepare_deck(): a seeded engine's shoe keeps drawing from one source instead of reseeding"""
+    engine = Engine([Player("Joe", 100000)], 1, seed=3)
+    engine.prepare_deck()
+    seeds = []
+    shuffle = engine.deck.shuffle
+    engine.deck.shuffle = lambda seed=None: seeds.append(seed) or shuffle(seed)
+    for _ in range(50):
+        engine.play_round()
+    assert seeds and all(seed is None for seed in seeds)
+    other = Engine([Player("Joe", 100000)], 1, seed=3)
+    engine = Engine([Player("Joe", 100000)], 1, seed=3)
+    assert [engine.play_round() for _ in range(50)] == \
+        [other.play_round() for _ in range(50)]
+
+
+@pytest.mark.parametrize("shoe_class", [Shoe, ContinuousShuffler, PermutedShoe])
+def test_play_round_full_table_one_deck(shoe_class):
+    """play_round(): every seat filled on one deck never runs out of cards"""
+    players = [Player(f"Player {i}", 10 ** 9) for i in range(Settings.MAX_PLAYERS)]
+    engine = Engine(players, 1, seed=1, shoe_class=shoe_class)
+    for _ in range(2000):
+        engine.play_round()
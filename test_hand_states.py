@@ -0,0 +1,53 @@
+from cards import Card, Hand
+from itertools import product
+import hand_states
+
+
+def every_hand(max_cards: int):
+    ranks = [Card(rank, "H") for rank in Card.RANKS]
+    for size in range(1, max_cards + 1):
+        for cards in product(ranks, repeat=size):
+            yield list(cards)
+
+
+# ---------- HAND STATES ----------
+
+
+# step()
+
+
+def test_step_matches_hand():
+    """step(): every hand of up to four cards agrees with Hand"""
+    for cards in every_hand(4):
+        hand = Hand(cards)
+        state = hand_states.from_hand(hand)
+        assert hand_states.is_bust(state) == hand.is_bust()
+        if not hand.is_bust():
+            assert hand_states.score(state) == hand.get_score()
+            assert hand_states.is_soft(state) == hand.is_soft()
+            assert hand_states.is_blackjack(state) == hand.is_blackjack()
+            assert hand_states.number_of_cards(state) == hand.number_of_cards()
+
+
+def test_step_bust_absorbs():
+    """step(): drawing to a bust hand stays bust"""
+    assert hand_states.step(hand_states.BUST, 1) == hand_states.BUST
+
+
+def test_step_code():
+    """step_code(): card codes step the same as card values"""
+    for code in range(52):
+        assert hand_states.step_code(hand_states.START, code) == hand_states.step(
+            hand_states.START, Card.from_code(code).get_value())
+
+
+# number_of_cards()
+
+
+def test_number_of_cards_saturates():
+    """number_of_cards(): counts stop at MAX_CARDS"""
+    state = hand_states.START
+    for _ in range(7):
+        state = hand_states.step(state, 1)
+    assert hand_states.number_of_cards(state) == hand_states.MAX_CARDS
+    assert hand_states.score(state) == 17
@@ -0,0 +1,109 @@
+import pytest
+from array import array
+from random import Random
+from shoe import Shoe
+import rng
+
+
+BACKENDS = sorted(rng.BACKENDS)
+
+
+# ---------- RANDOM SOURCES ----------
+
+
+# shuffle()
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_source_shuffle_is_permutation(name):
+    """shuffle(): the buffer is reordered in place with every code kept"""
+    codes = array("B", range(52)) * 2
+    rng.make(name, 3).shuffle(codes)
+    assert sorted(codes) == sorted(list(range(52)) * 2)
+    assert list(codes) != sorted(codes)
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_source_reproducible(name):
+    """shuffle(): the same seed and stream shuffle the same way"""
+    first, second = array("B", range(52)), array("B", range(52))
+    rng.make(name, 3, 2).shuffle(first)
+    rng.make(name, 3, 2).shuffle(second)
+    assert first == second
+
+
+def test_mersenne_twister_matches_random():
+    """shuffle(): stream 0 of the Mersenne Twister shuffles like random.Random"""
+    codes, expected = array("B", range(52)), list(range(52))
+    rng.MersenneTwister(9).shuffle(codes)
+    Random(9).shuffle(expected)
+    assert list(codes) == expected
+
+
+# jumped()
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_source_streams_differ(name):
+    """jumped(): each stream shuffles differently, and split() gives the same streams"""
+    source = rng.make(name, 3)
+    orders = []
+    for stream in source.split(3):
+        codes = array("B", range(52))
+        stream.shuffle(codes)
+        orders.append(list(codes))
+    assert len({tuple(order) for order in orders}) == 3
+    codes = array("B", range(52))
+    source.jumped(2).shuffle(codes)
+    assert list(codes) == orders[2]
+    assert source.jumped(2).get_stream() == 2
+
+
+# make()
+
+
+def test_make_invalid_backend():
+    """make(): an unknown backend raises"""
+    with pytest.raises(ValueError):
+        rng.make("xorshift", 1)
+
+
+# getrandbits()
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_source_getrandbits_range(name):
+    """getrandbits(): draws fit in the number of bits"""
+    source = rng.make(name, 5)
+    assert all(0 <= source.getrandbits(8) < 256 for _ in range(200))
+    assert all(0 <= source.randrange(7) < 7 for _ in range(200))
+
+
+# Shoe
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_shoe_with_source(name):
+    """Shoe: a shoe given a source shuffles from it and deals the whole shoe"""
+    first = Shoe(2, rng=rng.make(name, 4))
+    second = Shoe(2, rng=rng.make(name, 4))
+    first.shuffle()
+    second.shuffle()
+    drawn = [first.pick_code() for _ in range(104)]
+    assert drawn == [second.pick_code() for _ in range(104)]
+    assert sorted(drawn) == sorted(list(range(52)) * 2)
+
+
+# get_state()
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_source_state_round_trip(name):
+    """get_state(): a restored source carries on with the same draws"""
+    source = rng.make(name, 8)
+    source.getrandbits(32)
+    state = source.get_state()
+    expected = [source.getrandbits(32) for _ in range(5)]
+    other = rng.make(name, 1)
+    other.set_state(state)
+    assert [other.getrandbits(32) for _ in range(5)] == expected
@@ -0,0 +1,61 @@
+import multiprocessing
+import pytest
+from comparison import shoe_corpus
+from shared_corpus import SharedCorpus
+from shoe import Shoe
+
+
+def first_card_code(name: str, index: int) -> int:
+    corpus = SharedCorpus.attach(name)
+    try:
+        return corpus.shoe(index)[-1]
+    finally:
+        corpus.close()
+
+
+# ---------- SHARED CORPUS ----------
+
+
+# create()
+
+
+def test_shared_corpus_matches_corpus():
+    """create(): the shoes match comparison.shoe_corpus() for the same seed"""
+    expected = shoe_corpus(4, 9, 2)
+    with SharedCorpus.create(4, 9, 2) as corpus:
+        assert len(corpus) == 4
+        assert corpus.get_number_of_decks() == 2
+        assert [bytes(corpus.shoe(i)) for i in range(4)] == \
+            [order.tobytes() for order in expected]
+
+
+def test_shared_corpus_read_only():
+    """shoe(): views of the corpus cannot be written"""
+    with SharedCorpus.create(1, 9) as corpus:
+        view = corpus.shoe(0)
+        with pytest.raises(TypeError):
+            view[0] = 0
+        with pytest.raises(IndexError):
+            corpus.shoe(1)
+        view.release()
+
+
+def test_shared_corpus_loads_into_shoe():
+    """shoe(): a shoe loaded from the corpus deals its codes from the end"""
+    with SharedCorpus.create(1, 9) as corpus:
+        view = corpus.shoe(0)
+        shoe = Shoe(1)
+        shoe.load(view)
+        assert shoe.pick_code() == view[-1]
+        view.release()
+
+
+# attach()
+
+
+def test_shared_corpus_attach_from_process():
+    """attach(): another process reads the same shoes without a copy being sent"""
+    with SharedCorpus.create(3, 9) as corpus:
+        with multiprocessing.Pool(2) as pool:
+            codes = pool.starmap(first_card_code, [(corpus.get_name(), i) for i in range(3)])
+        assert codes == [corpus.shoe(i)[-1] for i in range(3)]
@@ -0,0 +1,253 @@
+from array import array
+import pytest
+from cards import Deck
+from shoe import Shoe, ContinuousShuffler, PermutedShoe, CARDS
+from settings import Settings
+import counting
+
+
+# ----------- SHOE -----------
+
+
+# __init__()
+
+
+def test_shoe_size():
+    """__init__(): shoe holds 52 cards per pack"""
+    assert Shoe(1).size() == 52
+    assert Shoe(Settings.MAX_DECK_PACKS).size() == 52 * Settings.MAX_DECK_PACKS
+
+
+def test_shoe_invalid_number_of_decks():
+    """__init__(): number of decks must be within the allowed range"""
+    with pytest.raises(ValueError):
+        Shoe(0)
+    with pytest.raises(ValueError):
+        Shoe(Settings.MAX_DECK_PACKS + 1)
+
+
+# pick()
+
+
+def test_shoe_pick_matches_deck():
+    """pick(): a shoe deals the same cards as a deck shuffled with the same seed"""
+    shoe = Shoe(2)
+    deck = Deck(number_of_decks=2)
+    shoe.shuffle(99)
+    deck.shuffle(99)
+    for _ in range(104):
+        assert shoe.pick().get_string() == deck.pick().get_string()
+
+
+def test_shoe_pick_shared_cards():
+    """pick(): cards come from the shared table rather than being created"""
+    shoe = Shoe(1)
+    assert shoe.pick() is CARDS[51]
+
+
+def test_shoe_pick_empty():
+    """pick(): error raised when every card has been drawn"""
+    shoe = Shoe(1)
+    for _ in range(52):
+        shoe.pick()
+    with pytest.raises(ValueError):
+        shoe.pick()
+
+
+# shuffle()
+
+
+def test_shoe_shuffle_returns_cards():
+    """shuffle(): drawn cards go back into the shoe"""
+    shoe = Shoe(1)
+    drawn = sorted(shoe.pick_code() for _ in range(10))
+    shoe.shuffle(5)
+    assert shoe.remaining() == 52
+    assert sorted(shoe.pick_code() for _ in range(52)) == list(range(52))
+    assert drawn == list(range(42, 52))
+
+
+# get_running_count()
+
+
+def test_shoe_count_matches_deck():
+    """get_running_count(): a shoe counts the same as a deck dealing the same cards"""
+    shoe = Shoe(2, counting.KO)
+    deck = Deck(number_of_decks=2, tags=counting.KO)
+    shoe.shuffle(8)
+    deck.shuffle(8)
+    for _ in range(70):
+        shoe.pick()
+        deck.pick()
+        assert shoe.get_running_count() == deck.get_running_count()
+        assert shoe.get_true_count() == deck.get_true_count()
+
+
+def test_shoe_count_reset_on_shuffle():
+    """shuffle(): the count starts again"""
+    shoe = Shoe(1)
+    for _ in range(10):
+        shoe.pick()
+    shoe.shuffle(2)
+    assert shoe.get_running_count() == 0
+    assert shoe.get_decks_remaining() == 1
+
+
+# needs_shuffle()
+
+
+def test_shoe_needs_shuffle_at_cut_card():
+    """needs_shuffle(): true once the cards before the cut card are drawn"""
+    shoe = Shoe(1, penetration=0.5)
+    shoe.shuffle(1)
+    for _ in range(25):
+        shoe.pick()
+    assert not shoe.needs_shuffle()
+    shoe.pick()
+    assert shoe.needs_shuffle()
+    shoe.shuffle(2)
+    assert not shoe.needs_shuffle()
+
+
+def test_shoe_invalid_penetration():
+    """__init__(): penetration must be a fraction of the shoe"""
+    with pytest.raises(ValueError):
+        Shoe(1, penetration=0)
+    with pytest.raises(ValueError):
+        Shoe(1, penetration=1.5)
+
+
+# shuffle()
+
+
+def test_shoe_shuffle_reuses_buffer():
+    """shuffle(): the same buffer is shuffled in place"""
+    shoe = Shoe(2)
+    codes = shoe._Shoe__codes
+    shoe.shuffle(1)
+    shoe.shuffle(2)
+    assert shoe._Shoe__codes is codes
+
+
+# load()
+
+
+def test_shoe_load_deals_order():
+    """load(): the shoe deals the loaded order, last code first"""
+    shoe = Shoe(1)
+    order = array("B", range(52))
+    shoe.load(order)
+    assert shoe.pick() is CARDS[51]
+    assert shoe.remaining() == 51
+    with pytest.raises(ValueError):
+        shoe.load(array("B", range(51)))
+
+
+# discard()
+
+
+def test_shoe_recycles_discards_mid_round():
+    """pick(): an empty shoe shuffles the discard tray back in, not the cards in play"""
+    shoe = Shoe(1)
+    shoe.shuffle(3)
+    discarded = [shoe.pick_code() for _ in range(40)]
+    shoe.discard()
+    in_play = [shoe.pick_code() for _ in range(12)]
+    recycled = [shoe.pick_code() for _ in range(40)]
+    assert sorted(recycled) == sorted(discarded)
+    assert shoe.get_running_count() == sum(
+        counting.HI_LO[code % 13] for code in in_play + recycled)
+    with pytest.raises(ValueError):
+        shoe.pick()
+
+
+# ----------- CONTINUOUS SHUFFLER -----------
+
+
+def test_continuous_shuffler_draws_every_card():
+    """pick(): each card in the reservoir is drawn once before it runs out"""
+    machine = ContinuousShuffler(2)
+    machine.shuffle(4)
+    codes = sorted(machine.pick_code() for _ in range(104))
+    assert codes == sorted(list(range(52)) * 2)
+    with pytest.raises(ValueError):
+        machine.pick()
+
+
+def test_continuous_shuffler_discard_returns_cards():
+    """discard(): the round's cards go back into the reservoir"""
+    machine = ContinuousShuffler(1)
+    machine.shuffle(4)
+    for _ in range(10):
+        machine.pick()
+    machine.discard()
+    assert machine.remaining() == 52
+    assert machine.get_running_count() == 0
+    assert not machine.needs_shuffle()
+
+
+def test_continuous_shuffler_reproducible():
+    """shuffle(): the same seed draws the same cards"""
+    first, second = ContinuousShuffler(1), ContinuousShuffler(1)
+    first.shuffle(9)
+    second.shuffle(9)
+    assert [first.pick_code() for _ in range(20)] == [second.pick_code() for _ in range(20)]
+
+
+# ----------- PERMUTED SHOE -----------
+
+
+@pytest.mark.parametrize("number_of_decks", [1, 3, Settings.MAX_DECK_PACKS])
+def test_permuted_shoe_is_permutation(number_of_decks):
+    """position(): every position of the shoe is drawn exactly once"""
+    shoe = PermutedShoe(number_of_decks)
+    shoe.shuffle(11)
+    positions = [shoe.position(index) for index in range(shoe.size())]
+    assert sorted(positions) == list(range(shoe.size()))
+
+
+def test_permuted_shoe_deals_whole_shoe():
+    """pick(): the shoe deals each pack's cards once, then runs out"""
+    shoe = PermutedShoe(2)
+    shoe.shuffle(11)
+    assert sorted(shoe.pick_code() for _ in range(104)) == sorted(list(range(52)) * 2)
+    with pytest.raises(ValueError):
+        shoe.pick()
+
+
+def test_permuted_shoe_seeds_differ():
+    """shuffle(): different seeds give different orders, the same seed the same order"""
+    first, second, third = PermutedShoe(1), PermutedShoe(1), PermutedShoe(1)
+    first.shuffle(1)
+    second.shuffle(1)
+    third.shuffle(2)
+    order = [first.pick_code() for _ in range(52)]
+    assert order == [second.pick_code() for _ in range(52)]
+    assert order != [third.pick_code() for _ in range(52)]
+    assert order != list(range(52))
+
+
+def test_permuted_shoe_cut_card():
+    """needs_shuffle(): true once the cards before the cut card are drawn"""
+    shoe = PermutedShoe(1, penetration=0.5)
+    shoe.shuffle(3)
+    for _ in range(26):
+        assert not shoe.needs_shuffle()
+        shoe.pick()
+    assert shoe.needs_shuffle()
+
+
+def test_permuted_shoe_recycles_discards_mid_round():
+    """pick(): a round running out is finished from the cards discarded before it"""
+    shoe = PermutedShoe(1)
+    shoe.shuffle(5)
+    discarded = [shoe.pick_code() for _ in range(40)]
+    shoe.discard()
+    in_play = [shoe.pick_code() for _ in range(12)]
+    recycled = [shoe.pick_code() for _ in range(40)]
+    assert sorted(recycled) == sorted(discarded)
+    assert shoe.get_running_count() == sum(
+        counting.tags_by_code(counting.HI_LO)[code] for code in in_play + recycled)
+    assert shoe.needs_shuffle()
+    with pytest.raises(ValueError):
+        shoe.pick()
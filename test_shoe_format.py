@@ -0,0 +1,106 @@
+import pytest
+from cards import Card, Deck
+from rng import PCG64
+from shoe import Shoe
+import shoe_format
+
+
+# ---------- SHOE RECORDS ----------
+
+
+# loads()
+
+
+def test_round_trip_deck():
+    """loads(): a record deals exactly the cards of the Deck it was made from"""
+    deck = Deck(number_of_decks=2)
+    deck.shuffle(11)
+    data = shoe_format.dump_deck(deck, 2, 11, 0)
+    assert len(data) == shoe_format.HEADER.size + 104
+    record = shoe_format.loads(data)
+    assert (record.number_of_decks, record.seed, record.rng_id) == (2, 11, 0)
+    copy = record.to_deck()
+    assert [copy.pick() for _ in range(104)] == [deck.pick() for _ in range(104)]
+
+
+def test_round_trip_partial_deck():
+    """loads(): decks with cards already drawn keep only the cards left"""
+    deck = Deck(cards=[Card("A", "S"), Card("K", "H"), Card("7", "D")])
+    record = shoe_format.loads(shoe_format.dump_deck(deck, 1))
+    assert record.seed is None and record.rng_id is None
+    assert record.get_cards() == [Card("A", "S"), Card("K", "H"), Card("7", "D")]
+
+
+def test_loads_zero_copy():
+    """loads(): the codes are a view of the buffer, not a copy"""
+    data = bytearray(shoe_format.dumps(bytes(range(52)), 1))
+    record = shoe_format.loads(data)
+    data[-1] = 0
+    assert record.codes[-1] == 0
+    assert record.codes.obj is data
+
+
+def test_loads_into_shoe():
+    """loads(): a full record can be loaded straight into a Shoe"""
+    shoe = Shoe(1, rng=PCG64(3))
+    shoe.shuffle()
+    record = shoe_format.loads(shoe_format.dumps(shoe.remaining_codes(), 1, 3, PCG64.ID))
+    copy = Shoe(1)
+    copy.load(record.codes)
+    assert [copy.pick_code() for _ in range(52)] == [shoe.pick_code() for _ in range(52)]
+
+
+def test_loads_invalid():
+    """loads(): other data and cut-short records raise"""
+    data = shoe_format.dumps(bytes(range(52)), 1)
+    with pytest.raises(ValueError):
+        shoe_format.loads(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        shoe_format.loads(data[:-1])
+    empty = shoe_format.HEADER.pack(shoe_format.MAGIC, shoe_format.VERSION,
+                                    shoe_format.NO_RNG, 1, 0, 0)
+    with pytest.raises(ValueError):
+        shoe_format.loads(empty)
+
+
+# dumps()
+
+
+def test_dumps_invalid():
+    """dumps(): bad codes, sizes and seeds raise"""
+    with pytest.raises(ValueError):
+        shoe_format.dumps(bytes([52]), 1)
+    with pytest.raises(ValueError):
+        shoe_format.dumps(bytes(53), 1)
+    with pytest.raises(ValueError):
+        shoe_format.dumps(bytes(52), 1, seed=4)
+    with pytest.raises(ValueError):
+        shoe_format.dumps(bytes(52), 1, seed=-1, rng_id=0)
+
+
+def test_dumps_empty_shoe():
+    """dumps(): a shoe with no cards left cannot be recorded, as no Deck could deal it"""
+    shoe = Shoe(1)
+    shoe.shuffle(3)
+    for _ in range(52):
+        shoe.pick_code()
+    with pytest.raises(ValueError):
+        shoe_format.dumps(shoe.remaining_codes(), 1)
+
+
+# ---------- ARCHIVES ----------
+
+
+def test_archive_round_trip(tmp_path):
+    """ShoeArchive: records written together are read back in order"""
+    records = []
+    for seed in range(3):
+        deck = Deck(number_of_decks=seed + 1)
+        deck.shuffle(seed)
+        records.append(shoe_format.dump_deck(deck, seed + 1, seed, 0))
+    path = str(tmp_path / "shoes.bin")
+    shoe_format.write_archive(path, records)
+    with shoe_format.ShoeArchive(path) as archive:
+        read = [(record.seed, bytes(record.codes)) for record in archive]
+    assert read == [(seed, data[shoe_format.HEADER.size:])
+                    for seed, data in enumerate(records)]
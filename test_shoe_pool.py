@@ -0,0 +1,107 @@
+import pytest
+import threading
+import time
+from engine import Engine
+from has_hands import Player
+from settings import Settings
+from shoe import Shoe, ContinuousShuffler, PermutedShoe
+from shoe_pool import ShoePool
+
+
+# ---------- SHOE POOL ----------
+
+
+# get()
+
+
+def test_shoe_pool_orders_are_shoes():
+    """get(): each order holds every card of the shoe"""
+    with ShoePool(2, 5) as pool:
+        order = pool.get()
+        assert sorted(order) == sorted(list(range(52)) * 2)
+
+
+def test_shoe_pool_reproducible():
+    """get(): the same seed gives the same orders, with buffers recycled or not"""
+    with ShoePool(1, 5, size=2) as first, ShoePool(1, 5, size=8) as second:
+        orders = []
+        for _ in range(6):
+            order = first.get()
+            orders.append(list(order))
+            first.recycle(order)
+        assert orders == [list(second.get()) for _ in range(6)]
+        assert orders[0] != orders[1]
+
+
+def test_shoe_pool_closed():
+    """get(): a closed pool gives no more orders"""
+    pool = ShoePool(1, 5)
+    pool.close()
+    with pytest.raises(ValueError):
+        pool.get()
+
+
+def test_shoe_pool_closed_while_waiting(monkeypatch):
+    """get(): a caller waiting for an order is woken when the pool closes"""
+    monkeypatch.setattr("shoe_pool.Random.shuffle", lambda self, order: time.sleep(0.5))
+    pool = ShoePool(1, 5)
+    errors = []
+
+    def wait_for_order():
+        try:
+            pool.get()
+        except ValueError as error:
+            errors.append(error)
+
+    waiter = threading.Thread(target=wait_for_order)
+    waiter.start()
+    time.sleep(0.1)
+    pool.close()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert len(errors) == 1
+
+
+def test_shoe_pool_every_order_out():
+    """get(): with every buffer out and none recycled, get() raises instead of waiting"""
+    with ShoePool(1, 5, size=1) as pool:
+        orders = [pool.get(), pool.get()]
+        with pytest.raises(ValueError):
+            pool.get()
+        pool.recycle(orders[0])
+        assert sorted(pool.get()) == list(range(52))
+
+
+# Engine
+
+
+def test_engine_with_shoe_pool():
+    """prepare_deck(): tables load shoes from the pool in order"""
+    with ShoePool(1, 5) as pool:
+        expected = pool.get()
+    with ShoePool(1, 5) as pool:
+        engine = Engine([Player("Joe", 100000)], 1, shoe_pool=pool)
+        engine.play_round()
+        shoe = Shoe(1)
+        shoe.load(expected)
+        assert engine.players[0].get_hands()[0].get_card_by_index(0) is shoe.pick()
+
+
+def test_engine_with_shoe_pool_recycles_reproducibly():
+    """prepare_deck(): a full table on one deck plays the same rounds for the same seeds"""
+    results = []
+    for _ in range(2):
+        with ShoePool(1, 5) as pool:
+            players = [Player(f"Player {i}", 100000000) for i in range(Settings.MAX_PLAYERS)]
+            engine = Engine(players, 1, seed=3, shoe_pool=pool)
+            results.append([engine.play_round() for _ in range(300)])
+    assert results[0] == results[1]
+
+
+def test_engine_shoe_pool_needs_load():
+    """__init__(): shoe classes which cannot load an order are refused with a pool"""
+    with ShoePool(1, 5) as pool:
+        with pytest.raises(ValueError):
+            Engine([Player("Joe", 100000)], 1, shoe_class=ContinuousShuffler, shoe_pool=pool)
+        with pytest.raises(ValueError):
+            Engine([Player("Joe", 100000)], 1, shoe_class=PermutedShoe, shoe_pool=pool)
@@ -0,0 +1,166 @@
+from shoe import Shoe, ContinuousShuffler, PermutedShoe
+import math
+import pytest
+from settings import Settings
+from simulation import SimulationResult, seed_stream, simulate, run_simulation, run_until
+
+
+# ---------- SEED STREAMS ----------
+
+
+def test_seed_stream_reproducible():
+    """seed_stream(): the same master seed and index give the same seed"""
+    assert seed_stream(42, 3) == seed_stream(42, 3)
+
+
+def test_seed_stream_independent():
+    """seed_stream(): different indexes and master seeds give different seeds"""
+    seeds = {seed_stream(master, i) for master in range(3) for i in range(8)}
+    assert len(seeds) == 24
+
+
+# ---------- SIMULATION ----------
+
+
+# simulate()
+
+
+def test_simulate_counts():
+    """simulate(): every hand is a win, loss or push"""
+    result = simulate(200, 1, number_of_players=2)
+    assert result.rounds == 200
+    assert result.hands >= 400
+    assert result.wins + result.losses + result.pushes == result.hands
+
+
+def test_simulate_rounds_differ():
+    """simulate(): rounds are not all dealt from the same shuffle"""
+    result = simulate(100, 1)
+    assert 0 < result.wins < 100
+
+
+# merge()
+
+
+def test_merge():
+    """merge(): totals are added together"""
+    first = simulate(50, 1)
+    second = simulate(70, 2)
+    merged = SimulationResult()
+    merged.merge(first)
+    merged.merge(second)
+    assert merged.rounds == 120
+    assert merged.net_total == first.net_total + second.net_total
+
+
+# get_standard_error()
+
+
+def test_standard_error():
+    """get_standard_error(): matches the sample variance of the hands"""
+    result = SimulationResult()
+    bet = Settings.MINIMUM_BET
+    result.add_round([("win", bet), ("lose", -bet), ("win", bet), ("push", 0)])
+    assert result.get_ev_per_hand() == 0.25
+    assert result.get_variance_per_hand() == pytest.approx(11 / 12)
+    assert result.get_standard_error() == pytest.approx(math.sqrt(11 / 48))
+    assert SimulationResult().get_standard_error() == math.inf
+
+
+# run_until()
+
+
+def test_run_until_stops_at_width():
+    """run_until(): stops at the first batch whose interval is narrow enough"""
+    result = run_until(0.1, 3, batch_rounds=500)
+    assert result.get_interval_width() <= 0.1
+    assert result.rounds % 500 == 0
+    shorter = run_until(0.1, 3, batch_rounds=500, max_rounds=result.rounds - 500)
+    assert shorter.get_interval_width() > 0.1
+
+
+def test_run_until_max_rounds():
+    """run_until(): never plays more than max_rounds"""
+    assert run_until(1e-6, 3, batch_rounds=400, max_rounds=1000).rounds == 1000
+
+
+def test_run_until_workers_agree():
+    """run_until(): a pool stops at the same batch as a single worker"""
+    assert run_until(0.2, 5, batch_rounds=100, workers=3) == \
+        run_until(0.2, 5, batch_rounds=100)
+
+
+def test_run_until_rng_streams():
+    """run_until(): with an rng_name, batch i shuffles from stream i of the seed"""
+    result = run_until(1e-6, 5, batch_rounds=100, max_rounds=300, rng_name="mt19937")
+    expected = SimulationResult()
+    for stream in range(3):
+        expected.merge(simulate(100, 5, rng_name="mt19937", stream=stream))
+    assert result == expected
+    assert result != run_until(1e-6, 5, batch_rounds=100, max_rounds=300)
+
+
+# run_simulation()
+
+
+def test_run_simulation_reproducible():
+    """run_simulation(): the same seed and worker count give the same result"""
+    assert run_simulation(300, 7, workers=2) == run_simulation(300, 7, workers=2)
+
+
+def test_run_simulation_single_worker_matches_pool():
+    """run_simulation(): one worker plays the same rounds as simulate() on stream 0"""
+    assert run_simulation(100, 7, workers=1) == simulate(100, seed_stream(7, 0))
+
+
+def test_run_simulation_splits_rounds():
+    """run_simulation(): all rounds are played across the workers"""
+    assert run_simulation(301, 7, workers=3).rounds == 301
+
+
+def test_simulate_continuous_shuffler():
+    """simulate(): tables can deal from a continuous shuffling machine"""
+    result = simulate(300, 1, number_of_players=3, shoe_class=ContinuousShuffler)
+    assert result.rounds == 300
+    assert result.wins + result.losses + result.pushes == result.hands
+
+
+# ---------- CHECKPOINTS ----------
+
+
+@pytest.mark.parametrize("shoe_class", [Shoe, ContinuousShuffler, PermutedShoe])
+@pytest.mark.parametrize("rng_name", [None, "pcg64"])
+def test_simulate_resumes_from_checkpoint(tmp_path, monkeypatch, shoe_class, rng_name):
+    """simulate(): a run killed after a checkpoint finishes with the same result"""
+    path = str(tmp_path / "run.checkpoint")
+    add_round = SimulationResult.add_round
+
+    def killed_at_250(result, results):
+        if result.rounds == 250:
+            raise KeyboardInterrupt
+        add_round(result, results)
+
+    monkeypatch.setattr(SimulationResult, "add_round", killed_at_250)
+    with pytest.raises(KeyboardInterrupt):
+        simulate(600, 3, 2, shoe_class=shoe_class, rng_name=rng_name,
+                 checkpoint=path, checkpoint_every=100)
+    monkeypatch.setattr(SimulationResult, "add_round", add_round)
+    resumed = simulate(600, 3, 2, shoe_class=shoe_class, rng_name=rng_name,
+                       checkpoint=path, checkpoint_every=100)
+    assert resumed == simulate(600, 3, 2, shoe_class=shoe_class, rng_name=rng_name)
+
+
+def test_simulate_checkpoint_other_run(tmp_path):
+    """simulate(): a checkpoint from a different run is refused"""
+    path = str(tmp_path / "run.checkpoint")
+    simulate(200, 3, checkpoint=path, checkpoint_every=100)
+    with pytest.raises(ValueError):
+        simulate(200, 4, checkpoint=path)
+
+
+def test_run_simulation_checkpoints_per_worker(tmp_path):
+    """run_simulation(): each worker keeps its own checkpoint"""
+    path = str(tmp_path / "run")
+    first = run_simulation(400, 7, workers=2, checkpoint=path, checkpoint_every=100)
+    assert (tmp_path / "run.0").exists() and (tmp_path / "run.1").exists()
+    assert first == run_simulation(400, 7, workers=2)
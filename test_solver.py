@@ -0,0 +1,118 @@
+import csv
+import pytest
+from dealer_probabilities import dealer_distribution, full_composition, remove_card, BLACKJACK
+import solver
+
+
+def shoe_without(number_of_decks: int, values: list[int]) -> tuple[int, ...]:
+    composition = full_composition(number_of_decks)
+    for value in values:
+        composition = remove_card(composition, value)
+    return composition
+
+
+# ---------- SOLVER ----------
+
+
+# action_evs()
+
+
+def test_action_evs_hard_16_against_ten():
+    """action_evs(): hitting 16 against a ten beats sticking"""
+    evs = solver.action_evs([10, 6], 10, shoe_without(1, [10, 6, 10]))
+    assert set(evs) == {"hit", "stick", "double-down"}
+    assert evs["hit"] > evs["stick"]
+
+
+def test_action_evs_double_eleven():
+    """action_evs(): doubling 11 against a 6 is the best action"""
+    evs = solver.action_evs([5, 6], 6, shoe_without(2, [5, 6, 6]))
+    assert max(evs, key=evs.get) == "double-down"
+
+
+def test_action_evs_stick_twenty():
+    """action_evs(): sticking on 20 is worth the chance of beating the dealer"""
+    composition = shoe_without(1, [10, 10, 7])
+    dealer = dealer_distribution(7, composition)
+    expected = dealer[5] + dealer[0] + dealer[1] + dealer[2] - dealer[4] - dealer[BLACKJACK]
+    evs = solver.action_evs([10, 10], 7, composition, can_split=False)
+    assert evs["stick"] == pytest.approx(expected)
+
+
+def test_action_evs_blackjack():
+    """action_evs(): a blackjack has no choices and pays 3:2 unless the dealer has one"""
+    composition = shoe_without(1, [1, 10, 10])
+    evs = solver.action_evs([1, 10], 10, composition)
+    dealer = dealer_distribution(10, composition)
+    assert evs == {"stick": pytest.approx(1.5 * (1 - dealer[BLACKJACK]))}
+
+
+def test_action_evs_split_only_pairs():
+    """action_evs(): split is only offered for pairs with splits left"""
+    assert "split" in solver.action_evs([8, 8], 6, shoe_without(1, [8, 8, 6]))
+    assert "split" not in solver.action_evs([8, 8], 6, shoe_without(1, [8, 8, 6]),
+                                            splits_left=0)
+    assert "split" not in solver.action_evs([8, 7], 6, shoe_without(1, [8, 7, 6]))
+
+
+def test_action_evs_split_without_resplits():
+    """action_evs(): with one split left, both hands are played out without resplitting"""
+    composition = shoe_without(1, [8, 8, 6])
+    split = solver.action_evs([8, 8], 6, composition, splits_left=1)["split"]
+    played = 0.0
+    for value in range(1, 11):
+        probability = composition[value - 1] / sum(composition)
+        if probability:
+            following = remove_card(composition, value)
+            played += probability * max(solver.action_evs([8, value], 6, following,
+                                                          can_split=False).values())
+    assert split == pytest.approx(2 * played)
+
+
+def test_action_evs_resplits_counted_across_hands():
+    """action_evs(): more splits left never lowers the value of a split"""
+    composition = shoe_without(1, [8, 8, 6])
+    splits = [solver.action_evs([8, 8], 6, composition, splits_left=n)["split"]
+              for n in range(1, 4)]
+    assert splits[0] <= splits[1] <= splits[2]
+
+
+def test_action_evs_ten_resplits_by_rank():
+    """action_evs(): ten pairs resplit only on one of the two cards of their rank left"""
+    composition = shoe_without(1, [10, 10, 6])
+    split = solver.action_evs([10, 10], 6, composition, splits_left=2)["split"]
+    assert split == pytest.approx(
+        solver.action_evs([10, 10], 6, composition, splits_left=2, rank_left=2)["split"])
+    assert solver.action_evs([10, 10], 6, composition, splits_left=2, rank_left=0)["split"] == \
+        pytest.approx(solver.action_evs([10, 10], 6, composition, splits_left=1)["split"])
+
+
+def test_action_evs_bust():
+    """action_evs(): a bust hand has no actions"""
+    with pytest.raises(ValueError):
+        solver.action_evs([10, 10, 5], 6, shoe_without(1, [10, 10, 5, 6]))
+
+
+# best_actions()
+
+
+def test_best_actions_fallback():
+    """best_actions(): a double-down falls back to the better of hit and stick"""
+    assert solver.best_actions({"hit": 0.1, "stick": -0.2, "double-down": 0.3}) == \
+        ("double-down", "hit")
+
+
+# export_csv()
+
+
+def test_export_csv(tmp_path):
+    """export_csv(): one row per chart hand and upcard"""
+    table = solver.strategy_table(1, upcards=[6])
+    path = tmp_path / "chart.csv"
+    solver.export_csv(table, path)
+    with open(path) as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == len(solver.chart_hands())
+    row = next(row for row in rows if (row["kind"], row["total"]) == ("hard", "11"))
+    assert row["action"] == "double-down"
+    assert row["fallback"] == "hit"
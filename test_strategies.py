@@ -0,0 +1,152 @@
+import pytest
+from cards import Card, Hand
+from has_hands import Player
+from settings import Settings
+from support.testing_util import make_engine
+from strategies import BasicStrategy, DealerStrategy, ReplayStrategy, decide_batch
+
+
+# ---------- STRATEGIES ----------
+
+
+# DealerStrategy
+
+
+def test_dealer_strategy():
+    """DealerStrategy: hits below 17 and sticks otherwise"""
+    upcard = Card("7", "S")
+    actions = ["hit", "stick"]
+    assert DealerStrategy()(Hand([Card("10", "H"), Card("6", "D")]), upcard, actions) == "hit"
+    assert DealerStrategy()(Hand([Card("10", "H"), Card("7", "D")]), upcard, actions) == "stick"
+
+
+# ReplayStrategy
+
+
+def test_replay_strategy_plays_recording():
+    """ReplayStrategy: recorded actions are played in order"""
+    cards = [Card("5", "H"), Card("10", "S"), Card("6", "H"), Card("8", "S"),
+             Card("9", "D")]
+    engine = make_engine(cards, strategy=ReplayStrategy(["double-down"]))
+    assert engine.play_round() == [("win", 2 * Settings.MINIMUM_BET)]
+
+
+def test_replay_strategy_runs_out():
+    """ReplayStrategy: error raised when the recording runs out"""
+    with pytest.raises(ValueError):
+        ReplayStrategy([])(Hand(), Card("7", "S"), ["hit", "stick"])
+
+
+# plain callables
+
+
+def test_callable_strategy():
+    """Player: any callable can decide, and is given the dealer's upcard"""
+    seen = []
+
+    def stick(hand, upcard, actions):
+        seen.append((upcard, actions))
+        return "stick"
+    cards = [Card("10", "H"), Card("10", "S"), Card("6", "H"), Card("8", "S")]
+    engine = make_engine(cards, strategy=stick)
+    assert engine.play_round() == [("lose", -Settings.MINIMUM_BET)]
+    assert seen == [(Card("8", "S"), ["hit", "stick", "double-down"])]
+
+
+def test_strategy_not_allowed():
+    """choose_action(): an action outside the allowed actions raises an error"""
+    cards = [Card("10", "H"), Card("10", "S"), Card("6", "H"), Card("8", "S")]
+    engine = make_engine(cards, strategy=lambda hand, upcard, actions: "split")
+    with pytest.raises(ValueError):
+        engine.play_round()
+
+
+def test_player_strategy_not_callable():
+    """Player: strategy must be callable"""
+    with pytest.raises(ValueError):
+        Player("Bot", 100000, "hit")
+
+
+# decide_batch()
+
+
+def test_decide_batch():
+    """decide_batch(): one decision per hand, for strategies and plain callables"""
+    hands = [Hand([Card("10", "H"), Card(rank, "D")]) for rank in ["2", "9"]]
+    upcards = [Card("7", "S")] * 2
+    actions = [["hit", "stick"]] * 2
+    assert decide_batch(DealerStrategy(), hands, upcards, actions) == ["hit", "stick"]
+    assert decide_batch(lambda hand, upcard, allowed: "stick",
+                        hands, upcards, actions) == ["stick", "stick"]
+
+
+# BasicStrategy
+
+
+CHART = [
+    {"kind": "hard", "total": 11, "upcard": 6, "action": "double-down", "fallback": "hit"},
+    {"kind": "hard", "total": 16, "upcard": 10, "action": "hit", "fallback": "hit"},
+    {"kind": "soft", "total": 18, "upcard": 6, "action": "double-down", "fallback": "stick"},
+    {"kind": "pair", "total": 8, "upcard": 6, "action": "split", "fallback": "hit"},
+]
+
+
+def test_basic_strategy_action():
+    """BasicStrategy: plays the chart's action when it is allowed"""
+    strategy = BasicStrategy(CHART)
+    hand = Hand([Card("5", "H"), Card("6", "D")])
+    assert strategy(hand, Card("6", "S"), ["hit", "stick", "double-down"]) == "double-down"
+
+
+def test_basic_strategy_fallback():
+    """BasicStrategy: falls back when the chart's action is not allowed"""
+    strategy = BasicStrategy(CHART)
+    hand = Hand([Card("A", "H"), Card("5", "D"), Card("2", "D")])
+    assert strategy(hand, Card("6", "S"), ["hit", "stick"]) == "stick"
+
+
+def test_basic_strategy_pair():
+    """BasicStrategy: pairs use the pair row only while splitting is allowed"""
+    strategy = BasicStrategy(CHART)
+    hand = Hand([Card("8", "H"), Card("8", "D")])
+    assert strategy(hand, Card("6", "S"), ["hit", "stick", "split"]) == "split"
+    assert strategy(hand, Card("6", "S"), ["hit", "stick"]) == "hit"
+
+
+def test_basic_strategy_default():
+    """BasicStrategy: totals missing from the chart play like the dealer"""
+    strategy = BasicStrategy([])
+    assert strategy(Hand([Card("10", "H"), Card("8", "D")]), Card("6", "S"),
+                    ["hit", "stick"]) == "stick"
+    assert strategy(Hand([Card("A", "H"), Card("A", "D")]), Card("6", "S"),
+                    ["hit", "stick", "split"]) == "hit"
+
+
+def test_basic_strategy_invalid_row():
+    """BasicStrategy: chart rows must be hard, soft or pair"""
+    with pytest.raises(ValueError):
+        BasicStrategy([{"kind": "other", "total": 5, "upcard": 2,
+                        "action": "hit", "fallback": "hit"}])
+
+
+def test_basic_strategy_from_csv(tmp_path):
+    """from_csv(): reads a chart exported by the solver"""
+    import solver
+    table = solver.strategy_table(1, upcards=[6])
+    solver.export_csv(table, tmp_path / "chart.csv")
+    strategy = BasicStrategy.from_csv(tmp_path / "chart.csv")
+    hand = Hand([Card("5", "H"), Card("6", "D")])
+    assert strategy(hand, Card("6", "S"), ["hit", "stick", "double-down"]) == "double-down"
+    assert strategy(hand, Card("6", "S"), ["hit", "stick"]) == "hit"
+
+
+def test_basic_strategy_from_charts(tmp_path):
+    """from_charts(): reads one deck count of a chart file"""
+    import charts
+    column = bytearray([0x11] * len(charts.ROWS))
+    column[charts.ROW_INDEXES[("hard", 16)]] = 0x30
+    charts.write_charts(tmp_path / "charts.bin", {1: [bytes(column)] * 10}, False)
+    strategy = BasicStrategy.from_charts(charts.Charts(tmp_path / "charts.bin"), 1)
+    hand = Hand([Card("10", "H"), Card("6", "D")])
+    assert strategy(hand, Card("9", "S"), ["hit", "stick", "double-down"]) == "double-down"
+    assert strategy(hand, Card("9", "S"), ["hit", "stick"]) == "hit"
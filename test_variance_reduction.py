@@ -0,0 +1,142 @@
+import pytest
+from array import array
+from shoe import ContinuousShuffler, PermutedShoe
+from simulation import SimulationResult, simulate, run_simulation, run_until
+from variance_reduction import METHODS, MIRROR, VarianceReduction, mirror
+import counting
+import math
+
+
+# ---------- ANTITHETIC SHOES ----------
+
+
+# mirror()
+
+
+def test_mirror_keeps_cards_and_flips_count():
+    """mirror(): the twin holds the same cards with every Hi-Lo tag negated"""
+    order = array("B", range(52))
+    twin = mirror(order)
+    assert sorted(twin) == list(range(52))
+    tags = counting.tags_by_code(counting.HI_LO)
+    assert all(tags[MIRROR[code]] == -tags[code] for code in range(52))
+    assert mirror(twin) == order
+
+
+# ---------- ESTIMATES ----------
+
+
+# VarianceReduction
+
+
+def test_variance_reduction_plain():
+    """VarianceReduction: the plain method is the mean round, and saves nothing"""
+    reduction = VarianceReduction("plain")
+    for value in (1.0, -1.0, 0.0, 2.0):
+        reduction.add_round(value, 5, 0.0, 0)
+    reduction.close()
+    assert reduction.get_ev() == 0.5
+    assert reduction.get_standard_error() == pytest.approx(math.sqrt(5 / 3 / 4))
+    assert reduction.get_variance_saved() == 0
+
+
+def test_variance_reduction_shoe_units():
+    """VarianceReduction: antithetic takes each shoe and its mirror as one unit"""
+    reduction = VarianceReduction("antithetic")
+    for shoe, value in enumerate((1.0, -1.0, 2.0, -2.0)):
+        reduction.add_round(value, 5, 0.0, shoe)
+    reduction.close()
+    assert reduction.get_ev() == 0
+    assert reduction.get_standard_error() == 0
+    assert reduction.get_plain_standard_error() > 0
+    assert reduction.get_variance_saved() == 1
+
+
+def test_variance_reduction_stratified_needs_every_upcard():
+    """VarianceReduction: stratified has no interval until every upcard has come up"""
+    reduction = VarianceReduction("stratified")
+    for value in (1.0, -1.0, 0.0):
+        reduction.add_round(value, 10, 0.0, 0)
+    assert reduction.get_standard_error() == math.inf
+
+
+def test_variance_reduction_invalid_method():
+    """VarianceReduction: unknown methods raise"""
+    with pytest.raises(ValueError):
+        VarianceReduction("importance")
+
+
+# ---------- SIMULATION RUNS ----------
+
+
+# simulate()
+
+
+def test_simulate_control_averages_zero():
+    """simulate(): the dealer-bust control is centred on zero, and lowers the standard error"""
+    reduction = simulate(4000, 4, method="control").reduction
+    assert abs(reduction.control_total / reduction.rounds) < 0.02
+    assert reduction.get_standard_error() < reduction.get_plain_standard_error()
+    assert 0 < reduction.get_variance_saved() < 1
+
+
+def test_simulate_antithetic_plays_mirrors():
+    """simulate(): an antithetic table deals each shoe and then its mirror"""
+    reduction = simulate(2000, 4, method="antithetic").reduction
+    assert reduction.pairs.units * 2 >= reduction.shoes.units >= 2 * reduction.pairs.units - 1
+    assert reduction.pairs.rounds == reduction.shoes.rounds == 2000
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_simulate_methods_agree(method):
+    """simulate(): every method lands near the plain estimate, on the same rounds"""
+    result = simulate(2000, 6, method=method)
+    reduction = result.reduction
+    assert result.rounds == reduction.rounds == 2000
+    assert abs(reduction.get_ev() + 0.05) < 5 * reduction.get_plain_standard_error()
+    assert reduction.get_standard_error() > 0
+    assert reduction == simulate(2000, 6, method=method).reduction
+
+
+def test_simulate_method_shoe_classes():
+    """simulate(): methods which need a shoe's cards refuse shoes that cannot show them"""
+    assert simulate(200, 1, shoe_class=ContinuousShuffler, method="control").rounds == 200
+    with pytest.raises(ValueError):
+        simulate(10, 1, shoe_class=ContinuousShuffler, method="antithetic")
+    with pytest.raises(ValueError):
+        simulate(10, 1, shoe_class=PermutedShoe, method="control")
+
+
+def test_simulate_method_resumes_from_checkpoint(tmp_path, monkeypatch):
+    """simulate(): an antithetic run killed after a checkpoint finishes with the same sums"""
+    path = str(tmp_path / "run.checkpoint")
+    add_round = SimulationResult.add_round
+
+    def killed_at_250(result, results):
+        if result.rounds == 250:
+            raise KeyboardInterrupt
+        add_round(result, results)
+
+    monkeypatch.setattr(SimulationResult, "add_round", killed_at_250)
+    with pytest.raises(KeyboardInterrupt):
+        simulate(600, 3, method="antithetic", checkpoint=path, checkpoint_every=100)
+    monkeypatch.setattr(SimulationResult, "add_round", add_round)
+    resumed = simulate(600, 3, method="antithetic", checkpoint=path, checkpoint_every=100)
+    assert resumed == simulate(600, 3, method="antithetic")
+
+
+# run_simulation() and run_until()
+
+
+def test_run_simulation_merges_methods():
+    """run_simulation(): workers' sums for a method are merged"""
+    result = run_simulation(400, 2, workers=2, method="stratified")
+    assert result.reduction.rounds == 400
+
+
+def test_run_until_method_interval():
+    """run_until(): with a method, stops on the method's interval"""
+    result = run_until(0.1, 3, batch_rounds=500, method="control")
+    assert result.reduction.get_interval_width() <= 0.1
+    assert result.rounds % 500 == 0
+    assert run_until(0.1, 3, batch_rounds=500, method="control", workers=2) == result
@@ -0,0 +1,229 @@
+from array import array
+from hand_states import CODE_VALUES
+from statistics import NormalDist
+import dealer_probabilities
+import math
+
+
+# A simulation run with a method records, for each round, its net result per
+# seat (in minimum bets), the upcard's value, a control and the number of the
+# shoe it was dealt from. Every method estimates EV per round for each seat,
+# and reports its standard error next to the one plain Monte Carlo gives for
+# the same rounds. Rounds are treated as independent, as SimulationResult
+# treats hands, except under antithetic, where whole shoes are the units.
+METHODS = ("plain", "antithetic", "stratified", "control")
+
+# Antithetic twin of each rank (ace first): the low cards 2 to 6 swap with
+# the ace and tens, and 7 to 9 stay, so every Hi-Lo tag changes sign while
+# the shoe keeps the same cards.
+MIRROR_RANKS = (1, 0, 12, 11, 10, 9, 6, 7, 8, 5, 4, 3, 2)
+
+# Antithetic twin of each card code
+MIRROR = array("B", ((code // 13) * 13 + MIRROR_RANKS[code % 13] for code in range(52)))
+
+# Chance of each upcard value (ace is 1) off the top of a shoe
+UPCARD_WEIGHTS = (1 / 13,) * 9 + (4 / 13,)
+
+
+def mirror(codes) -> array:
+    """The antithetic twin of a shoe order."""
+    return array("B", (MIRROR[code] for code in codes))
+
+
+def bust_probability(upcard: int, unseen, hole_card: int) -> float:
+    """
+    Exact chance of the dealer busting with the upcard's value, when the hole
+    card's value and the unseen codes left in the shoe are all that is known.
+    The control is whether the dealer busts less this chance, which averages
+    to exactly 0.
+    """
+    composition = [0] * 10
+    for code in unseen:
+        composition[CODE_VALUES[code] - 1] += 1
+    composition[hole_card - 1] += 1
+    distribution = dealer_probabilities.dealer_distribution(upcard, tuple(composition))
+    return distribution[dealer_probabilities.BUST]
+
+
+def _mean_and_variance(count: int, total: float, squares: float) -> tuple[float, float]:
+    if count < 2:
+        return (total / count if count else 0.0), math.inf
+    mean = total / count
+    return mean, max(squares - mean * total, 0.0) / (count - 1)
+
+
+class _Units():
+    """Sums over units of several rounds each, for a ratio estimate of the mean round."""
+
+    def __init__(self):
+        self.units = 0
+        self.total = 0.0
+        self.rounds = 0
+        self.total_squares = 0.0
+        self.rounds_squares = 0
+        self.cross = 0.0
+
+    def add(self, total: float, rounds: int) -> None:
+        self.units += 1
+        self.total += total
+        self.rounds += rounds
+        self.total_squares += total * total
+        self.rounds_squares += rounds * rounds
+        self.cross += total * rounds
+
+    def merge(self, other: "_Units") -> None:
+        for name, value in vars(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def get_mean(self) -> float:
+        return self.total / self.rounds if self.rounds else 0.0
+
+    def get_standard_error(self) -> float:
+        """Standard error of get_mean(), from the spread of the units about it."""
+        if self.units < 2:
+            return math.inf
+        mean = self.get_mean()
+        residuals = self.total_squares - 2 * mean * self.cross + mean * mean * self.rounds_squares
+        return math.sqrt(max(residuals, 0.0) * self.units / (self.units - 1)) / self.rounds
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Units) and vars(self) == vars(other)
+
+
+class VarianceReduction():
+    """
+    Streaming sums for one method's estimate, which can be merged with those
+    of other batches. Rounds are added in the order they are played; close()
+    counts the shoe still being played, and must be called before merging.
+    """
+
+    def __init__(self, method: str):
+        if method not in METHODS:
+            raise ValueError("Invalid variance reduction method passed.")
+        self.method = method
+        self.rounds = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.upcard_rounds = [0] * 10
+        self.upcard_totals = [0.0] * 10
+        self.upcard_squares = [0.0] * 10
+        self.control_total = 0.0
+        self.control_squares = 0.0
+        self.cross = 0.0
+        # Each shoe, and each shoe with its mirror, as a unit
+        self.shoes = _Units()
+        self.pairs = _Units()
+        # The shoe and pair being played: the number, total and rounds of each
+        self.open_shoe = None
+        self.open_pair = None
+
+    def add_round(self, value: float, upcard: int, control: float, shoe: int) -> None:
+        self.rounds += 1
+        self.total += value
+        self.squares += value * value
+        self.upcard_rounds[upcard - 1] += 1
+        self.upcard_totals[upcard - 1] += value
+        self.upcard_squares[upcard - 1] += value * value
+        self.control_total += control
+        self.control_squares += control * control
+        self.cross += value * control
+        self.open_shoe = self.__carry(self.shoes, self.open_shoe, shoe, value)
+        self.open_pair = self.__carry(self.pairs, self.open_pair, shoe // 2, value)
+
+    @staticmethod
+    def __carry(units: _Units, current: list, number: int, value: float) -> list:
+        """Add the round to the unit being played, counting the last one once a new one starts."""
+        if current is not None and current[0] != number:
+            units.add(current[1], current[2])
+            current = None
+        if current is None:
+            return [number, value, 1]
+        return [number, current[1] + value, current[2] + 1]
+
+    def close(self) -> None:
+        """Count the shoe still being played as a unit."""
+        for units, current in ((self.shoes, self.open_shoe), (self.pairs, self.open_pair)):
+            if current is not None:
+                units.add(current[1], current[2])
+        self.open_shoe = None
+        self.open_pair = None
+
+    def merge(self, other: "VarianceReduction") -> None:
+        if other.method != self.method:
+            raise ValueError("Cannot merge different methods.")
+        self.rounds += other.rounds
+        self.total += other.total
+        self.squares += other.squares
+        for i in range(10):
+            self.upcard_rounds[i] += other.upcard_rounds[i]
+            self.upcard_totals[i] += other.upcard_totals[i]
+            self.upcard_squares[i] += other.upcard_squares[i]
+        self.control_total += other.control_total
+        self.control_squares += other.control_squares
+        self.cross += other.cross
+        self.shoes.merge(other.shoes)
+        self.pairs.merge(other.pairs)
+
+    def get_ev(self) -> float:
+        """The method's estimate of EV per round for each seat, in minimum bets."""
+        return self.__estimate()[0]
+
+    def get_standard_error(self) -> float:
+        return self.__estimate()[1]
+
+    def get_plain_standard_error(self) -> float:
+        """
+        Standard error plain Monte Carlo gives for the same rounds. Under
+        antithetic, it takes each shoe as a unit instead of each pair.
+        """
+        if self.method == "antithetic":
+            return self.shoes.get_standard_error()
+        _, variance = _mean_and_variance(self.rounds, self.total, self.squares)
+        return math.sqrt(variance / self.rounds) if self.rounds else math.inf
+
+    def get_variance_saved(self) -> float:
+        """Fraction of the plain estimate's variance the method removes."""
+        plain = self.get_plain_standard_error()
+        if plain == 0 or math.isinf(plain):
+            return 0.0
+        return 1 - (self.get_standard_error() / plain) ** 2
+
+    def get_interval_width(self, confidence: float = 0.95) -> float:
+        """Full width of the normal confidence interval around get_ev()."""
+        return 2 * NormalDist().inv_cdf((1 + confidence) / 2) * self.get_standard_error()
+
+    def __estimate(self) -> tuple[float, float]:
+        mean, _ = _mean_and_variance(self.rounds, self.total, self.squares)
+        if self.method == "plain":
+            return mean, self.get_plain_standard_error()
+        if self.method == "antithetic":
+            # Each shoe and its mirror make one unit
+            return self.pairs.get_mean(), self.pairs.get_standard_error()
+        if self.method == "stratified":
+            # Post-stratify on the upcard, weighting each stratum by its exact chance
+            ev = 0.0
+            variance = 0.0
+            for i, weight in enumerate(UPCARD_WEIGHTS):
+                count = self.upcard_rounds[i]
+                stratum_mean, stratum_variance = _mean_and_variance(
+                    count, self.upcard_totals[i], self.upcard_squares[i])
+                if math.isinf(stratum_variance):
+                    # Too few rounds to cover every upcard yet
+                    return mean, math.inf
+                ev += weight * stratum_mean
+                variance += weight * weight * stratum_variance / count
+            return ev, math.sqrt(variance)
+        # Control variate: subtract the part of the net explained by the dealer's luck
+        plain = self.get_plain_standard_error()
+        control_mean, control_variance = _mean_and_variance(
+            self.rounds, self.control_total, self.control_squares)
+        if control_variance == 0 or math.isinf(control_variance):
+            return mean, plain
+        _, variance = _mean_and_variance(self.rounds, self.total, self.squares)
+        covariance = (self.cross - mean * self.control_total) / (self.rounds - 1)
+        slope = covariance / control_variance
+        adjusted = max(variance - slope * covariance, 0.0)
+        return mean - slope * control_mean, math.sqrt(adjusted / self.rounds)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, VarianceReduction) and vars(self) == vars(other)